@@ -0,0 +1,242 @@
+import os
+import copy
+import constants
+from game_core import GameCore
+from batch_core import BatchGameCore
+from sparse_core import SparseGameCore
+from random_streams import RandomStreams
+from amoeba_state import ask_move
+from utils import *
+from players.default_player import Player as DefaultPlayer
+from players.g1_player import Player as G1_Player
+from players.g2_player import Player as G2_Player
+from players.g3_player import Player as G3_Player
+from players.g4_player import Player as G4_Player
+from players.g5_player import Player as G5_Player
+from players.g6_player import Player as G6_Player
+from players.g7_player import Player as G7_Player
+from players.g8_player import Player as G8_Player
+
+PLAYERS = {
+    "d": ("Default Player", DefaultPlayer),
+    "1": ("Group 1", G1_Player),
+    "2": ("Group 2", G2_Player),
+    "3": ("Group 3", G3_Player),
+    "4": ("Group 4", G4_Player),
+    "5": ("Group 5", G5_Player),
+    "6": ("Group 6", G6_Player),
+    "7": ("Group 7", G7_Player),
+    "8": ("Group 8", G8_Player),
+}
+
+
+class AmoebaEnv:
+    def __init__(self, player="d", bacteria_mode="compat", max_turns=1000, log_path=None, map_dim=constants.map_dim,
+                 backend="dense", play_out=False, rng_mode="legacy"):
+        """Plays many games of one player in the same process
+
+            The player, the loggers, the random number generators and the board buffers are set up once and reused
+            by every game, and nothing is rendered, so a batch of games runs at the speed of the engine. A game
+            started with reset(seed, metabolism, size, density) plays out exactly as AmoebaGame with the same
+            options and --no_gui --no_vid.
+
+            Args:
+                player (str): player to run, as given to --player
+                bacteria_mode (str): "compat" or "fast", see GameCore.bacteria_move
+                max_turns (int): turns after which a game ends without reaching the goal
+                log_path (str): file the result of every game is written to, nothing is logged if None
+                map_dim (int): side of the board every game is played on, which must be the default for the players
+                    in constants.fixed_map_players
+                backend (str): "dense" or "sparse", see SparseGameCore
+                play_out (bool): whether to play up to max_turns once the goal size can no longer be reached, as
+                    AmoebaGame does with --play_out
+                rng_mode (str): "legacy" or "streams", see RandomStreams
+        """
+        if player not in PLAYERS:
+            raise ValueError("Invalid player name {}".format(player))
+        check_map_dim(player, map_dim)
+        self.player_name, self.player_class = PLAYERS[player]
+        self.bacteria_mode = bacteria_mode
+        self.max_turns = max_turns
+        self.play_out = play_out
+        self.rng_mode = rng_mode
+        self.map_dim = map_dim
+        self.core_class = SparseGameCore if backend == "sparse" else GameCore
+
+        self.logger = logging.getLogger(__name__)
+        remove_handlers(self.logger)
+        if log_path:
+            self.logger.setLevel(logging.INFO)
+            self.logger.disabled = False
+            log_dir = os.path.dirname(log_path)
+            if log_dir:
+                os.makedirs(log_dir, exist_ok=True)
+            rfh = logging.FileHandler(log_path, mode="w")
+            rfh.setLevel(logging.INFO)
+            rfh.setFormatter(logging.Formatter('%(message)s'))
+            rfh.addFilter(MainLoggingFilter(__name__))
+            self.logger.addHandler(rfh)
+        else:
+            self.logger.setLevel(logging.ERROR)
+            self.logger.disabled = True
+        self.player_logger = logging.getLogger("{}.{}".format(__name__, self.player_name))
+        self.player_logger.setLevel(logging.ERROR)
+        self.player_logger.disabled = True
+        self.precomp_dir = os.path.join("precomp", self.player_name)
+        os.makedirs(self.precomp_dir, exist_ok=True)
+
+        # reseeded in place by reset, as the players keep a reference to the player generator
+        self.streams = RandomStreams(mode=rng_mode)
+        self.rng = self.streams.player
+        self.core = None
+        self.player = None
+        self.status = None
+        self.unreachable_turn = None
+        # players already built, by (metabolism, goal_size), with a copy of their state right after construction
+        self.players = {}
+
+    def close(self):
+        remove_handlers(self.logger)
+
+    def reset(self, seed=2, metabolism=1.0, size=15, density=0.3):
+        """Starts a new game
+
+            Args:
+                seed (int): seed of the random number generators, 0 or None for no seed
+                metabolism (float): proportion of the amoeba that may be retracted in one turn
+                size (int): side of the initial amoeba square
+                density (float): proportion of the free cells holding bacteria
+            Returns:
+                AmoebaState: percept the first move is decided on
+        """
+        self.streams.reseed(seed or None)
+        if self.core is None:
+            self.core = self.core_class(self.streams, metabolism, size, density, self.bacteria_mode, self.map_dim)
+        else:
+            self.core.reset(metabolism, size, density)
+        self.player = self.get_player(metabolism, self.core.goal_size)
+        self.status = None
+        self.unreachable_turn = self.unreachable_at(self.core)
+        if self.done:
+            self.logger.info(self.result())
+        return self.core.observe()
+
+    def get_player(self, metabolism, goal_size):
+        """Returns a player in the state it was built in, reusing an earlier one when that gives the same game"""
+        keep = {id(self.rng): self.rng, id(self.player_logger): self.player_logger}
+        key = (metabolism, goal_size)
+        if key in self.players:
+            player, initial = self.players[key]
+            player.__dict__ = copy.deepcopy(initial, dict(keep))
+            return player
+
+        state = self.rng.bit_generator.state
+        player = self.player_class(rng=self.rng, logger=self.player_logger, metabolism=metabolism,
+                                   goal_size=goal_size, precomp_dir=self.precomp_dir)
+        # a player that draws from the generator while being built has to be built again for every game
+        if self.rng.bit_generator.state == state:
+            try:
+                self.players[key] = (player, copy.deepcopy(player.__dict__, dict(keep)))
+            except (TypeError, copy.Error):
+                pass
+        return player
+
+    @property
+    def done(self):
+        return self.game_over(self.core, self.unreachable_turn)
+
+    def game_over(self, core, unreachable_turn):
+        return core.goal_reached or core.turns == self.max_turns or unreachable_turn is not None
+
+    def unreachable_at(self, core):
+        # ends the game at the current turn once the goal size is out of reach, as AmoebaGame.play_game does
+        if not self.play_out and not core.goal_reachable(self.max_turns - core.turns):
+            return core.turns
+        return None
+
+    def step(self, action=None):
+        """Plays one turn
+
+            Args:
+                action (tuple): (retract, extend, info) to play, the player is asked for its move if None
+            Returns:
+                str: "accepted", "rejected" or "invalid", see GameCore.step
+        """
+        if action is None:
+            action = ask_move(self.player, self.core.after_last_move, self.core.observe(), self.core.player_byte)
+        self.status = self.core.step(action)
+        if not self.done:
+            self.unreachable_turn = self.unreachable_at(self.core)
+        if self.done:
+            self.logger.info(self.result())
+        return self.status
+
+    def result(self):
+        return self.game_result(self.core, self.unreachable_turn)
+
+    def game_result(self, core, unreachable_turn):
+        return {
+            "player": self.player_name,
+            "metabolism": core.metabolism,
+            "size": core.start_size,
+            "density": core.density,
+            "goal_reached": core.goal_reached,
+            "unreachable_at": unreachable_turn,
+            "turns": core.turns,
+            "amoeba_size": core.amoeba_size,
+            "goal_size": core.goal_size,
+        }
+
+    def run(self, seed=2, metabolism=1.0, size=15, density=0.3):
+        """Plays a whole game and returns its result"""
+        self.reset(seed, metabolism, size, density)
+        while not self.done:
+            self.step()
+        return self.result()
+
+    def run_batch(self, seeds, metabolism=1.0, size=15, density=0.3):
+        """Plays one game per seed side by side on a BatchGameCore and returns their results
+
+            Each game has its own random number streams and its own player, built for it, and plays out exactly as
+            run with the same seed. The players are asked for their moves one game after the other, while the engine
+            handles all the games of a turn at once. Games are always played on the dense backend.
+
+            Args:
+                seeds (list): seed of each game, 0 or None for no seed
+                metabolism (float): proportion of the amoeba that may be retracted in one turn
+                size (int): side of the initial amoeba square
+                density (float): proportion of the free cells holding bacteria
+            Returns:
+                list: result of each game, in the order of seeds
+        """
+        rngs = [RandomStreams(seed or None, self.rng_mode) for seed in seeds]
+        batch = BatchGameCore(rngs, metabolism, size, density, self.bacteria_mode, self.map_dim)
+        players = [self.player_class(rng=game.rng, logger=self.player_logger, metabolism=metabolism,
+                                     goal_size=game.goal_size, precomp_dir=self.precomp_dir) for game in batch.games]
+        unreachable = [self.unreachable_at(game) for game in batch.games]
+
+        playing = []
+        for k, game in enumerate(batch.games):
+            if self.game_over(game, unreachable[k]):
+                self.logger.info(self.game_result(game, unreachable[k]))
+            else:
+                playing.append(k)
+
+        while playing:
+            percepts = batch.observe(playing)
+            actions = [ask_move(players[k], batch.games[k].after_last_move, percept, batch.games[k].player_byte)
+                       for k, percept in zip(playing, percepts)]
+            batch.step(playing, actions)
+
+            still_playing = []
+            for k in playing:
+                game = batch.games[k]
+                if not self.game_over(game, None):
+                    unreachable[k] = self.unreachable_at(game)
+                if self.game_over(game, unreachable[k]):
+                    self.logger.info(self.game_result(game, unreachable[k]))
+                else:
+                    still_playing.append(k)
+            playing = still_playing
+
+        return [self.game_result(game, turn) for game, turn in zip(batch.games, unreachable)]
@@ -2,11 +2,14 @@ import os
 import time
 import signal
 import numpy as np
-import math
 import matplotlib.pyplot as plt
 from matplotlib import colors
-from amoeba_state import AmoebaState
 import constants
+from game_core import GameCore
+from sparse_core import SparseGameCore
+from checkpoint import save_checkpoint, load_checkpoint
+from random_streams import RandomStreams
+from amoeba_state import ask_move
 from utils import *
 from glob import glob
 from players.default_player import Player as DefaultPlayer
@@ -20,7 +23,7 @@ from players.g7_player import Player as G7_Player
 from players.g8_player import Player as G8_Player
 
 
-class AmoebaGame:
+class AmoebaGame(GameCore):
     def __init__(self, args):
         self.start_time = time.time()
         self.use_gui = not args.no_gui
@@ -38,6 +41,8 @@ class AmoebaGame:
                 os.remove(f)
 
         self.logger = logging.getLogger(__name__)
+        remove_handlers(self.logger)
+        self.logger.disabled = False
         # create file handler which logs even debug messages
         if self.do_logging:
             self.logger.setLevel(logging.DEBUG)
@@ -77,29 +82,33 @@ class AmoebaGame:
         else:
             self.logger.info("Initialise random number generator with seed {}".format(args.seed))
 
-        self.rng = np.random.default_rng(args.seed)
-
         self.player = None
         self.player_name = None
-
-        self.metabolism = args.metabolism
-        self.start_size = args.size
-        self.amoeba_size = self.start_size ** 2
-        self.goal_size = self.amoeba_size * 4
-        self.goal_reached = False
-        self.turns = 0
         self.max_turns = args.final
         self.game_end = self.max_turns
-        self.density = args.density
-        self.bacteria = []
-        self.map_state = np.zeros((constants.map_dim, constants.map_dim), dtype=int)
-
-        self.after_last_move = None
-        self.player_byte = 0
+        self.play_out = args.play_out
+        # turn at which the goal size was found to be out of reach, None while it can still be reached
+        self.unreachable_turn = None
         self.history = []
-
-        self.initialize(args.size)
+        self.checkpoint_every = args.checkpoint_every
+        self.checkpoint_dir = args.checkpoint_dir
+        self.checkpoint_keep = args.checkpoint_keep
+        self.checkpoint_player = args.checkpoint_player
+        self.checkpoints = []
+
+        super().__init__(RandomStreams(args.seed, args.rng_mode), args.metabolism, args.size, args.density,
+                         args.bacteria_mode, args.map_dim)
+        # the checkpoint is loaded before the player is built, so that the player gets the metabolism and goal size
+        # of the resumed game rather than those given on the command line
+        restored_player = self.resume(args.resume) if args.resume else None
         self.add_player(args.player)
+        if restored_player is not None:
+            self.player = restored_player
+        if self.use_gui:
+            self.frame_rendering()
+        elif self.use_vid:
+            self.history.append(self.get_state())
+
         self.play_game()
         self.end_time = time.time()
 
@@ -118,8 +127,11 @@ class AmoebaGame:
         if self.use_gui:
             plt.show()
 
+        remove_handlers(self.logger)
+
     def add_player(self, player_in):
         if player_in in constants.possible_players:
+            check_map_dim(player_in, self.map_dim)
             if player_in.lower() == 'd':
                 player_class = DefaultPlayer
                 player_name = "Default Player"
@@ -164,6 +176,7 @@ class AmoebaGame:
 
         if self.do_logging:
             player_logger.setLevel(logging.INFO)
+            player_logger.disabled = False
             # add handler to self.logger with filtering
             player_fh = logging.FileHandler(os.path.join(self.log_dir, '{}.log'.format(player_name)), mode="w")
             player_fh.setLevel(logging.DEBUG)
@@ -176,266 +189,62 @@ class AmoebaGame:
 
         return player_logger
 
-    def initialize(self, sl):
-        for i in range(sl):
-            for j in range(sl):
-                if i == 0 or i == (sl - 1) or j == 0 or j == (sl - 1):
-                    self.map_state[50 - (sl // 2) + i][50 - (sl // 2) + j] = 2
-                else:
-                    self.map_state[50 - (sl // 2) + i][50 - (sl // 2) + j] = 1
+    def resume(self, path):
+        """Restores the game from a checkpoint and returns the player saved with it, None if it holds none"""
+        player = load_checkpoint(self, path)
+        self.logger.info("Resumed from checkpoint {} at turn {}".format(path, self.turns))
+        return player
 
-        self.bacteria = [tuple(i) for i in self.rng.choice(self.find_indices(0), replace=False, size=math.floor(
-            self.density * (constants.total_cells - self.amoeba_size)))]
-
-        for i, j in self.bacteria:
-            self.map_state[i][j] = -1
-
-        if self.use_gui:
-            self.frame_rendering()
-        elif self.use_vid:
-            self.history.append(self.get_state())
-
-        periphery, eatable_bacteria, movable_cells, amoeba = self.get_periphery_info(False)
-        self.after_last_move = AmoebaState(self.amoeba_size, amoeba, periphery, eatable_bacteria, movable_cells)
-
-    def find_indices(self, value):
-        result = np.where(self.map_state == value)
-        return list(zip(result[0], result[1]))
+    def write_checkpoint(self):
+        path = os.path.join(self.checkpoint_dir, "turn_{:06d}.npz".format(self.turns))
+        save_checkpoint(self, path, self.player if self.checkpoint_player else None)
+        self.checkpoints.append(path)
+        while len(self.checkpoints) > self.checkpoint_keep:
+            os.remove(self.checkpoints.pop(0))
 
     def play_game(self):
-        while self.turns != self.max_turns:
-            self.turns += 1
+        while self.turns < self.max_turns:
+            if not self.play_out and not self.goal_reachable(self.max_turns - self.turns):
+                self.unreachable_turn = self.game_end = self.turns
+                print("Goal size unreachable at turn {}".format(self.turns))
+                self.logger.info("Goal size unreachable at turn {}, ending the game".format(self.turns))
+                if self.use_gui:
+                    self.frame_rendering()
+                break
             self.play_turn()
             print("Turn {} complete".format(self.turns))
-            if self.amoeba_size >= self.goal_size:
-                self.goal_reached = True
+            if self.goal_reached:
                 self.game_end = self.turns
                 print("Goal size achieved!\n\nTurns taken: {}\nFinal size: {}\nGoal size: {}".format(self.turns,
                                                                                                      self.amoeba_size,
                                                                                                      self.goal_size))
                 break
+            if self.checkpoint_every and self.turns % self.checkpoint_every == 0:
+                self.write_checkpoint()
 
         if not self.goal_reached:
             print("Goal size not achieved...\n\nFinal size: {}\nGoal size: {}".format(self.amoeba_size, self.goal_size))
 
     def play_turn(self):
-        self.bacteria_move()
-        periphery, eatable_bacteria, movable_cells, amoeba = self.get_periphery_info(True)
-        before_state = AmoebaState(self.amoeba_size, amoeba, periphery, eatable_bacteria, movable_cells)
-        returned_action = self.player.move(
-            last_percept=self.after_last_move,
-            current_percept=before_state,
-            info=self.player_byte
-        )
-        self.eat_bacteria(eatable_bacteria)
-        if self.check_action(returned_action):
-            retract, move, self.player_byte = returned_action
-            if self.check_move(retract, move, periphery):
-                print("Move Accepted!")
-                self.logger.debug("Received move from {}".format(self.player_name))
-                self.amoeba_move(retract, move)
-            else:
-                print("Valid move, but causes separation, hence cancelled.")
-                self.logger.info("Invalid move from {} as it does not follow the rules".format(self.player_name))
+        before_state = self.observe()
+        returned_action = ask_move(self.player, self.after_last_move, before_state, self.player_byte)
+
+        status = self.step(returned_action)
+        if status == "accepted":
+            print("Move Accepted!")
+            self.logger.debug("Received move from {}".format(self.player_name))
+        elif status == "rejected":
+            print("Valid move, but causes separation, hence cancelled.")
+            self.logger.info("Invalid move from {} as it does not follow the rules".format(self.player_name))
         else:
             print("Invalid move")
             self.logger.info("Invalid move from {} as it doesn't follow the return format".format(self.player_name))
 
-        self.add_bacteria()
-
         if self.use_gui:
             self.frame_rendering()
         elif self.use_vid:
             self.history.append(self.get_state())
 
-        periphery, eatable_bacteria, movable_cells, amoeba = self.get_periphery_info(False)
-        self.after_last_move = AmoebaState(self.amoeba_size, amoeba, periphery, eatable_bacteria, movable_cells)
-
-    def bacteria_move(self):
-        for i, (x, y) in enumerate(self.bacteria):
-            avail = {'up': self.map_state[x][(y - 1) % constants.map_dim] == 0,
-                     'down': self.map_state[x][(y + 1) % constants.map_dim] == 0,
-                     'left': self.map_state[(x - 1) % constants.map_dim][y] == 0,
-                     'right': self.map_state[(x + 1) % constants.map_dim][y] == 0}
-            free_cells = [i for i in list(avail.keys()) if avail[i]]
-            move = None
-            if len(free_cells) == 2:
-                move = self.rng.choice(free_cells, replace=False)
-            elif len(free_cells) == 3:
-                if 'up' in free_cells and 'down' in free_cells:
-                    move = free_cells[-1]
-                else:
-                    move = free_cells[0]
-
-            if move:
-                self.map_state[x][y] = 0
-                if move == 'up':
-                    y = (y - 1) % constants.map_dim
-                elif move == 'down':
-                    y = (y + 1) % constants.map_dim
-                elif move == 'left':
-                    x = (x - 1) % constants.map_dim
-                else:
-                    x = (x + 1) % constants.map_dim
-
-                self.map_state[x][y] = -1
-                self.bacteria[i] = (x, y)
-
-    def get_periphery_info(self, edit):
-        periphery = self.find_indices(2)
-        eatable_bacteria = []
-        movable_cells = []
-        rem_idx = []
-        for i, j in periphery:
-            nbr = self.find_movable_neighbor(i, j)
-            rem = True
-            for x, y in nbr:
-                if (x, y) not in eatable_bacteria and (x, y) not in movable_cells:
-                    if self.map_state[x][y] == -1:
-                        eatable_bacteria.append((x, y))
-                    else:
-                        rem = False
-                        movable_cells.append((x, y))
-                elif self.map_state[x][y] == 0:
-                    rem = False
-
-            if rem and edit:
-                self.map_state[i][j] = 1
-                rem_idx.append((i, j))
-
-        periphery = list(set(periphery).difference(set(rem_idx)))
-
-        amoeba = np.copy(self.map_state)
-        amoeba[amoeba < 0] = 0
-        amoeba[amoeba > 0] = 1
-
-        return periphery, eatable_bacteria, movable_cells, amoeba
-
-    def find_movable_neighbor(self, x, y):
-        out = []
-        if self.map_state[x][(y - 1) % constants.map_dim] < 1:
-            out.append((x, (y - 1) % constants.map_dim))
-        if self.map_state[x][(y + 1) % constants.map_dim] < 1:
-            out.append((x, (y + 1) % constants.map_dim))
-        if self.map_state[(x - 1) % constants.map_dim][y] < 1:
-            out.append(((x - 1) % constants.map_dim, y))
-        if self.map_state[(x + 1) % constants.map_dim][y] < 1:
-            out.append(((x + 1) % constants.map_dim, y))
-
-        return out
-
-    def find_neighbor(self, x, y, val):
-        out = []
-        if self.map_state[x][(y - 1) % constants.map_dim] == val:
-            out.append((x, (y - 1) % constants.map_dim))
-        if self.map_state[x][(y + 1) % constants.map_dim] == val:
-            out.append((x, (y + 1) % constants.map_dim))
-        if self.map_state[(x - 1) % constants.map_dim][y] == val:
-            out.append(((x - 1) % constants.map_dim, y))
-        if self.map_state[(x + 1) % constants.map_dim][y] == val:
-            out.append(((x + 1) % constants.map_dim, y))
-
-        return out
-
-    def eat_bacteria(self, bacteria):
-        for i, j in bacteria:
-            self.bacteria.remove((i, j))
-            self.map_state[i][j] = 2
-            self.amoeba_size += 1
-
-    def check_action(self, action):
-        if not action:
-            return False
-        if type(action) is not tuple:
-            return False
-        if len(action) != 3:
-            return False
-        if type(action[2]) is not int:
-            return False
-        if action[2] < 0 or action[2] >= 256:
-            return False
-        if type(action[0]) is not list or type(action[1]) is not list:
-            return False
-        if len(action[0]) != len(set(action[0])) or len(action[1]) != len(set(action[1])):
-            return False
-        if len(action[0]) != len(action[1]) or len(action[0]) > math.ceil(self.metabolism * self.amoeba_size):
-            return False
-
-        return True
-
-    def check_move(self, retract, move, periphery):
-        if not set(retract).issubset(set(periphery)):
-            return False
-
-        movable = retract[:]
-        new_periphery = list(set(periphery).difference(set(retract)))
-        for i, j in new_periphery:
-            nbr = self.find_movable_neighbor(i, j)
-            for x, y in nbr:
-                if (x, y) not in movable:
-                    movable.append((x, y))
-
-        if not set(move).issubset(set(movable)):
-            return False
-
-        amoeba = np.copy(self.map_state)
-        amoeba[amoeba < 0] = 0
-        amoeba[amoeba > 0] = 1
-
-        for i, j in retract:
-            amoeba[i][j] = 0
-
-        for i, j in move:
-            amoeba[i][j] = 1
-
-        tmp = np.where(amoeba == 1)
-        result = list(zip(tmp[0], tmp[1]))
-        check = np.zeros((constants.map_dim, constants.map_dim), dtype=int)
-
-        stack = result[0:1]
-        while len(stack):
-            a, b = stack.pop()
-            check[a][b] = 1
-
-            if (a, (b - 1) % constants.map_dim) in result and check[a][(b - 1) % constants.map_dim] == 0:
-                stack.append((a, (b - 1) % constants.map_dim))
-            if (a, (b + 1) % constants.map_dim) in result and check[a][(b + 1) % constants.map_dim] == 0:
-                stack.append((a, (b + 1) % constants.map_dim))
-            if ((a - 1) % constants.map_dim, b) in result and check[(a - 1) % constants.map_dim][b] == 0:
-                stack.append(((a - 1) % constants.map_dim, b))
-            if ((a + 1) % constants.map_dim, b) in result and check[(a + 1) % constants.map_dim][b] == 0:
-                stack.append(((a + 1) % constants.map_dim, b))
-
-        return (amoeba == check).all()
-
-    def amoeba_move(self, retract, move):
-        for i, j in retract:
-            self.map_state[i][j] = 0
-            nbr = self.find_neighbor(i, j, 1)
-            for x, y in nbr:
-                self.map_state[x][y] = 2
-
-        for i, j in move:
-            self.map_state[i][j] = 2
-            nbr = self.find_neighbor(i, j, 2)
-            for x, y in nbr:
-                if len(self.find_movable_neighbor(x, y)) == 0:
-                    self.map_state[x][y] = 1
-
-    def add_bacteria(self):
-        new_bacteria = [tuple(i) for i in self.rng.choice(self.find_indices(0), replace=False, size=math.floor(
-            self.density * (constants.total_cells - self.amoeba_size)) - len(self.bacteria))]
-        self.bacteria += new_bacteria
-        for i, j in new_bacteria:
-            self.map_state[i][j] = -1
-
-    def get_state(self):
-        return_dict = dict()
-        return_dict['amoeba_size'] = self.amoeba_size
-        return_dict['bacteria'] = self.bacteria[:]
-        return_dict['map_state'] = np.copy(self.map_state)
-        return return_dict
-
     def frame_rendering(self):
         plt.clf()
         plt.title(
@@ -445,7 +254,7 @@ class AmoebaGame:
         cmap = colors.ListedColormap(["#000000", "#666666", "#90EE90", "#02FFFF"])
         bounds = [-1, 0, 1, 2, 3]
         norm = colors.BoundaryNorm(bounds, cmap.N)
-        x, y = np.meshgrid(list(range(100)), list(range(100)))
+        x, y = np.meshgrid(list(range(self.map_dim)), list(range(self.map_dim)))
         plt.pcolormesh(
             x + 0.5,
             y + 0.5,
@@ -470,8 +279,8 @@ class AmoebaGame:
         ax.yaxis.set_ticks_position("none")
 
         ax.set_aspect(1)
-        ax.set_xlim([0, 100])
-        ax.set_ylim([0, 100])
+        ax.set_xlim([0, self.map_dim])
+        ax.set_ylim([0, self.map_dim])
         ax.invert_yaxis()
 
         msg = "In progress..."
@@ -479,6 +288,8 @@ class AmoebaGame:
             msg = "Goal size achieved!"
         elif self.turns == self.max_turns:
             msg = "Goal size not achieved."
+        elif self.turns == self.unreachable_turn:
+            msg = "Goal size unreachable."
         elif self.turns == 0:
             msg = "Starting state."
 
@@ -502,7 +313,9 @@ class AmoebaGame:
         for f in old_files:
             os.remove(f)
 
-        for i, state in enumerate(self.history):
+        for state in self.history:
+            # a resumed game starts its history at the turn of the checkpoint
+            i = state['turns']
             plt.clf()
             plt.title("Turn {} - (m = {}, A = {}, d = {})".format(i, self.metabolism, self.start_size, self.density))
             ax = plt.gca()
@@ -510,7 +323,7 @@ class AmoebaGame:
             cmap = colors.ListedColormap(["#000000", "#666666", "#90EE90", "#02FFFF"])
             bounds = [-1, 0, 1, 2, 3]
             norm = colors.BoundaryNorm(bounds, cmap.N)
-            x, y = np.meshgrid(list(range(100)), list(range(100)))
+            x, y = np.meshgrid(list(range(self.map_dim)), list(range(self.map_dim)))
             plt.pcolormesh(
                 x + 0.5,
                 y + 0.5,
@@ -535,8 +348,8 @@ class AmoebaGame:
             ax.yaxis.set_ticks_position("none")
 
             ax.set_aspect(1)
-            ax.set_xlim([0, 100])
-            ax.set_ylim([0, 100])
+            ax.set_xlim([0, self.map_dim])
+            ax.set_ylim([0, self.map_dim])
             ax.invert_yaxis()
 
             msg = "In progress..."
@@ -544,6 +357,8 @@ class AmoebaGame:
                 msg = "Goal size achieved!"
             elif i == self.max_turns:
                 msg = "Goal size not achieved."
+            elif i == self.unreachable_turn:
+                msg = "Goal size unreachable."
             elif i == 0:
                 msg = "Starting state."
 
@@ -557,3 +372,7 @@ class AmoebaGame:
             )
 
             plt.savefig("render/{}.png".format(i))
+
+
+class SparseAmoebaGame(AmoebaGame, SparseGameCore):
+    """AmoebaGame played on the sparse backend, see SparseGameCore"""
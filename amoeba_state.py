@@ -1,15 +1,210 @@
+import numpy as np
+import constants
+import torus
+
+
+def cached_view(method):
+    """Turns method into a read-only property computed on first access and kept in the slot "_" + its name"""
+    slot = "_" + method.__name__
+
+    def get(self):
+        value = getattr(self, slot)
+        if value is None:
+            value = method(self)
+            setattr(self, slot, value)
+        return value
+
+    return property(get, doc=method.__doc__)
+
+
+def ask_move(player, last_percept, current_percept, info):
+    """Asks a player for its move, explaining the error of a player that writes into the read-only amoeba_map
+
+        Percepts hand out the board of the game as a read-only view, so players written for earlier versions, which
+        got a private copy, fail with numpy's "assignment destination is read-only" when they write into it.
+    """
+    try:
+        return player.move(last_percept=last_percept, current_percept=current_percept, info=info)
+    except ValueError as error:
+        if "read-only" not in str(error):
+            raise
+        raise ValueError("{} wrote into the read-only amoeba_map of a percept; call "
+                         "percept.writable_amoeba_map() to get a map it may write into".format(
+                             type(player).__module__)) from error
+
+
+# views that depend on amoeba_map, dropped when a player takes a writable copy of it
+AMOEBA_VIEWS = ("_amoeba_coords", "_amoeba_set", "_row_counts", "_col_counts")
+
+
 class AmoebaState:
-    def __init__(self, current_size, amoeba_map, periphery, bacteria, movable_cells):
+    __slots__ = ("current_size", "amoeba_map", "periphery", "bacteria", "movable_cells", "periphery_idx",
+                 "bacteria_idx", "movable_idx", "map_dim", "_periphery_set", "_periphery_mask", "_movable_set",
+                 "_movable_mask", "_bacteria_set", "delta") + AMOEBA_VIEWS
+
+    def __init__(self, current_size, amoeba_map, periphery, bacteria, movable_cells, periphery_idx=None,
+                 bacteria_idx=None, movable_idx=None, map_dim=constants.map_dim, delta=None):
         """
+            The board is a map_dim x map_dim torus, so players should wrap coordinates with % map_dim rather than
+            a fixed size; torus.get_torus(map_dim) gives the neighbour helpers for the board of the game.
+
+            Besides the fields below, a percept offers views of them that players often build every turn, such as
+            periphery_set or amoeba_coords. Each is computed the first time it is read and then kept, so it costs
+            the same however many times a turn it is asked for. The views are shared, so players should copy them
+            before modifying them; the sets are frozensets for that reason.
+
             Args:
                 current_size (int): current size of the amoeba
                 amoeba_map (numpy array): 2D array that represents the state of the board known to the amoeba
                 periphery (List[Tuple[int, int]]: list of cells on the periphery of the amoeba
                 bacteria (List[Tuple[int, int]]: list of bacteria known to the amoeba
                 movable_cells (List[Tuple[int, int]]: list of movable positions given the current amoeba state
+                periphery_idx (numpy array): flat board indices (x * map_dim + y) of the periphery cells, in
+                    row-major order, found from periphery by default
+                bacteria_idx (numpy array): flat board indices of the bacteria, in the order of bacteria, found
+                    from bacteria by default
+                movable_idx (numpy array): flat board indices of the movable positions, in the order of
+                    movable_cells, found from movable_cells by default
+                map_dim (int): side of the board
+                delta (PerceptDelta): changes since the percept of the previous turn, set by the game on the
+                    percepts players decide their moves on from the second turn on, None otherwise
         """
         self.current_size = current_size
         self.amoeba_map = amoeba_map
         self.periphery = periphery
         self.bacteria = bacteria
         self.movable_cells = movable_cells
+        self.map_dim = map_dim
+        self.delta = delta
+        grid = torus.get_torus(map_dim)
+        self.periphery_idx = np.sort(grid.to_flat(periphery)) if periphery_idx is None else periphery_idx
+        self.bacteria_idx = grid.to_flat(bacteria) if bacteria_idx is None else bacteria_idx
+        self.movable_idx = grid.to_flat(movable_cells) if movable_idx is None else movable_idx
+        for slot in ("_periphery_set", "_periphery_mask", "_movable_set", "_movable_mask", "_bacteria_set") + \
+                AMOEBA_VIEWS:
+            setattr(self, slot, None)
+
+    def writable_amoeba_map(self):
+        """Returns amoeba_map, replacing it first with a private copy if it is a read-only view shared with the game
+
+            The game hands out the same read-only board to every percept until the amoeba changes, so players that
+            want to write into the map should go through this method. The views of the amoeba are computed again
+            from the map the next time they are read.
+        """
+        if not self.amoeba_map.flags.writeable:
+            self.amoeba_map = self.amoeba_map.copy()
+        for slot in AMOEBA_VIEWS:
+            setattr(self, slot, None)
+        return self.amoeba_map
+
+    def copy(self):
+        """Returns a percept with the same content that players can change without touching this one
+
+            The cell lists are copied, while the read-only map, index arrays, views and delta are shared; a map a
+            player already made writable is copied.
+        """
+        other = AmoebaState.__new__(AmoebaState)
+        for slot in AmoebaState.__slots__:
+            setattr(other, slot, getattr(self, slot))
+        other.periphery = list(self.periphery)
+        other.bacteria = list(self.bacteria)
+        other.movable_cells = list(self.movable_cells)
+        if self.amoeba_map.flags.writeable:
+            other.amoeba_map = self.amoeba_map.copy()
+        return other
+
+    def mask(self, flat):
+        mask = np.zeros(self.map_dim * self.map_dim, dtype=bool)
+        mask[flat[flat >= 0]] = True
+        mask = mask.reshape(self.map_dim, self.map_dim)
+        mask.flags.writeable = False
+        return mask
+
+    @cached_view
+    def periphery_set(self):
+        """frozenset of the (x, y) periphery cells"""
+        return frozenset(self.periphery)
+
+    @cached_view
+    def periphery_mask(self):
+        """Read-only map_dim x map_dim bool array, True on the periphery cells"""
+        return self.mask(self.periphery_idx)
+
+    @cached_view
+    def movable_set(self):
+        """frozenset of the (x, y) movable positions"""
+        return frozenset(self.movable_cells)
+
+    @cached_view
+    def movable_mask(self):
+        """Read-only map_dim x map_dim bool array, True on the movable positions"""
+        return self.mask(self.movable_idx)
+
+    @cached_view
+    def bacteria_set(self):
+        """frozenset of the (x, y) bacteria known to the amoeba"""
+        return frozenset(self.bacteria)
+
+    @cached_view
+    def amoeba_coords(self):
+        """Read-only (current_size, 2) int array of the (x, y) cells of the amoeba, in row-major order"""
+        coords = np.transpose(self.amoeba_map.nonzero()).astype(int)
+        coords.flags.writeable = False
+        return coords
+
+    @cached_view
+    def amoeba_set(self):
+        """frozenset of the (x, y) cells of the amoeba"""
+        return frozenset(map(tuple, self.amoeba_coords.tolist()))
+
+    @cached_view
+    def row_counts(self):
+        """Read-only array of the number of amoeba cells in each row x"""
+        counts = np.bincount(self.amoeba_coords[:, 0], minlength=self.map_dim)
+        counts.flags.writeable = False
+        return counts
+
+    @cached_view
+    def col_counts(self):
+        """Read-only array of the number of amoeba cells in each column y"""
+        counts = np.bincount(self.amoeba_coords[:, 1], minlength=self.map_dim)
+        counts.flags.writeable = False
+        return counts
+
+
+class PerceptDelta:
+    __slots__ = ("amoeba_added", "amoeba_removed", "bacteria_eaten", "periphery_added", "periphery_removed",
+                 "movable_added", "movable_removed", "amoeba_added_idx", "amoeba_removed_idx", "bacteria_eaten_idx",
+                 "periphery_added_idx", "periphery_removed_idx", "movable_added_idx", "movable_removed_idx")
+
+    def __init__(self, current, periphery, movable, eaten, retract, move):
+        """What changed between the percepts of two turns in a row, so that players can keep their own indexes of
+            the board up to date in time proportional to the change
+
+            Each change is a list of (x, y) cells, with its flat board indices in the array of the same name ending
+            in _idx, both in increasing flat index order.
+
+            Args:
+                current (AmoebaState): percept of the current turn
+                periphery (numpy array): periphery_idx of the percept the move of the previous turn was decided on
+                movable (numpy array): movable_idx of the percept the move of the previous turn was decided on
+                eaten (numpy array): flat board indices of the bacteria eaten in the previous turn
+                retract (numpy array): flat board indices of the cells retracted in the previous turn, empty if the
+                    move was not applied
+                move (numpy array): flat board indices of the cells moved into in the previous turn, empty if the
+                    move was not applied
+        """
+        grid = torus.get_torus(current.map_dim)
+        changes = {
+            "amoeba_added": np.setdiff1d(np.concatenate([eaten, move]), retract),
+            "amoeba_removed": np.setdiff1d(retract, move),
+            "bacteria_eaten": np.sort(eaten),
+            "periphery_added": np.setdiff1d(current.periphery_idx, periphery),
+            "periphery_removed": np.setdiff1d(periphery, current.periphery_idx),
+            "movable_added": np.setdiff1d(current.movable_idx, movable),
+            "movable_removed": np.setdiff1d(movable, current.movable_idx),
+        }
+        for name, flat in changes.items():
+            flat.flags.writeable = False
+            setattr(self, name + "_idx", flat)
+            setattr(self, name, grid.to_cells(flat))
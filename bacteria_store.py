@@ -0,0 +1,103 @@
+import numpy as np
+import constants
+from chunked_array import ChunkedArray
+
+
+class BacteriaStore:
+    def __init__(self, total_cells=constants.total_cells, map_dim=constants.map_dim, capacity=1024, sparse=False):
+        """Ordered set of bacteria positions with constant time insert, delete and lookup
+
+            Positions are kept as flat board indices (x * map_dim + y) in an array of slots, in insertion order. A
+            board sized array maps every position to its slot. Deleting a bacterium only marks its slot as dead,
+            and dead slots are squeezed out once they make up half of the array, so the relative order of the
+            remaining bacteria never changes.
+
+            Args:
+                total_cells (int): number of cells of the board
+                map_dim (int): side of the board
+                capacity (int): number of slots to allocate up front
+                sparse (bool): whether to keep the board sized array in a ChunkedArray, for large boards
+        """
+        self.map_dim = map_dim
+        self.flat = np.zeros(capacity, dtype=int)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.slot = ChunkedArray(total_cells, -1) if sparse else np.full(total_cells, -1, dtype=int)
+        self.used = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, cell):
+        x, y = cell
+        return self.slot[x * self.map_dim + y] >= 0
+
+    def __iter__(self):
+        return map(tuple, self.coords().tolist())
+
+    def clear(self):
+        self.slot[self.flat[:self.used]] = -1
+        self.alive[:self.used] = False
+        self.used = 0
+        self.count = 0
+
+    def copy(self):
+        other = BacteriaStore.__new__(BacteriaStore)
+        other.map_dim = self.map_dim
+        other.flat = self.flat.copy()
+        other.alive = self.alive.copy()
+        other.slot = self.slot.copy()
+        other.used = self.used
+        other.count = self.count
+        return other
+
+    def add(self, flat):
+        """Appends bacteria at the given flat board indices, which must not hold a bacterium already"""
+        flat = np.asarray(flat, dtype=int)
+        end = self.used + len(flat)
+        if end > len(self.flat):
+            capacity = max(end, 2 * len(self.flat))
+            self.flat = np.resize(self.flat, capacity)
+            self.alive = np.resize(self.alive, capacity)
+            self.alive[self.used:] = False
+
+        self.flat[self.used:end] = flat
+        self.alive[self.used:end] = True
+        self.slot[flat] = np.arange(self.used, end)
+        self.used = end
+        self.count += len(flat)
+
+    def remove(self, pos):
+        """Deletes the bacterium at flat board index pos"""
+        self.alive[self.slot[pos]] = False
+        self.slot[pos] = -1
+        self.count -= 1
+        if 2 * self.count < self.used:
+            self.compact()
+
+    def compact(self):
+        keep = np.flatnonzero(self.alive[:self.used])
+        self.flat[:len(keep)] = self.flat[keep]
+        self.alive[:len(keep)] = True
+        self.alive[len(keep):self.used] = False
+        self.slot[self.flat[:len(keep)]] = np.arange(len(keep))
+        self.used = len(keep)
+
+    def positions(self):
+        """Returns the flat board index of every bacterium in insertion order, as a read-only view"""
+        if self.count != self.used:
+            self.compact()
+        view = self.flat[:self.used]
+        view.flags.writeable = False
+        return view
+
+    def move_to(self, flat):
+        """Moves every bacterium to a new position, flat holding the new positions in the order of positions()"""
+        old = self.positions()
+        self.slot[old] = -1
+        self.flat[:self.used] = flat
+        self.slot[flat] = np.arange(self.used)
+
+    def coords(self):
+        """Returns an (n, 2) array of the (x, y) cell of every bacterium in insertion order"""
+        return np.stack(np.divmod(self.positions(), self.map_dim), axis=-1)
@@ -0,0 +1,144 @@
+import numpy as np
+import constants
+from game_core import GameCore, move_bacteria_at_once, scan_periphery
+
+
+class BatchGameCore:
+    def __init__(self, rngs, metabolism, size, density, bacteria_mode="compat", map_dim=constants.map_dim):
+        """K independent games whose boards are the slices of one (K, map_dim, map_dim) array
+
+            Every game is a GameCore in self.games, with its own random number streams, bacteria and periphery
+            index, and plays out exactly as a GameCore on its own with the same streams. The work GameCore does
+            over whole boards is done once for the whole stack: finding the bacteria and free cells next to the
+            periphery and pruning the periphery, from the neighbours of the periphery cells of every game as
+            SparseGameCore does, finding the free cells bacteria spawn on in compat mode and, in fast mode, moving
+            the bacteria. The work that only touches the cells that change, such as eating and applying the moves,
+            stays with each game.
+
+            Args:
+                rngs (list): one RandomStreams or np.random.Generator per game, see GameCore
+                metabolism (float): proportion of the amoeba that may be retracted in one turn, in every game
+                size (int): side of the initial amoeba square, in every game
+                density (float): proportion of the free cells holding bacteria, in every game
+                bacteria_mode (str): "compat" or "fast", see GameCore.bacteria_move
+                map_dim (int): side of the boards
+        """
+        self.bacteria_mode = bacteria_mode
+        self.map_dim = map_dim
+        self.total_cells = map_dim * map_dim
+        self.map_state = np.zeros((len(rngs), map_dim, map_dim), dtype=np.int8)
+        # flat view of the whole stack, game k holding the cells from k * total_cells on
+        self.board = self.map_state.reshape(-1)
+        self.games = [GameCore(rng, metabolism, size, density, bacteria_mode, map_dim, map_state=board)
+                      for rng, board in zip(rngs, self.map_state)]
+
+    def __len__(self):
+        return len(self.games)
+
+    def split(self, flat, games):
+        """Splits indices into the flat stack that are grouped board after board, all on the given boards, into one
+            array of flat board indices per board
+        """
+        bounds = np.searchsorted(flat // self.total_cells, games[1:])
+        return np.split(flat % self.total_cells, bounds)
+
+    def scan(self, games, edit):
+        """Finds what GameCore.get_periphery_info finds on the boards of the given games
+
+            Args:
+                games (list): indices of the games, in increasing order
+                edit (bool): whether to find the periphery cells that no longer touch an empty cell too
+            Returns:
+                tuple: list of (eatable bacteria, free cells) pairs of flat index arrays in percept order, and list
+                    of the periphery cells that no longer touch an empty cell if edit is True, one entry per game
+        """
+        periphery = [self.games[k].get_periphery_frame()[0] for k in games]
+        offset = np.repeat(np.array(games) * self.total_cells, [len(cells) for cells in periphery])
+        local = np.concatenate(periphery)
+        nbr = self.games[0].torus.neighbor_idx[local] + offset[:, None]
+        (bacteria, free), enclosed = scan_periphery(self.board, nbr, edit=edit)
+
+        # the stack holds the boards in order, so the cells found on each board come in its percept order
+        found = list(zip(self.split(bacteria, games), self.split(free, games)))
+        if not edit:
+            return found, None
+        return found, self.split((local + offset)[enclosed], games)
+
+    def observe(self, games):
+        """Starts the current turn of the given games where needed, see GameCore.observe
+
+            Args:
+                games (list): indices of the games, in increasing order
+            Returns:
+                list: percept of the current turn of each game
+        """
+        starting = [k for k in games if self.games[k].current_percept is None]
+        if starting:
+            self.bacteria_move(starting)
+            found, removed = self.scan(starting, True)
+            for k, game_found, game_removed in zip(starting, found, removed):
+                game = self.games[k]
+                game.current_percept = game.with_delta(game.get_periphery_info(True, game_found, game_removed))
+        return [self.games[k].current_percept for k in games]
+
+    def step(self, games, actions):
+        """Plays the current turn of the given games, see GameCore.step
+
+            Args:
+                games (list): indices of the games, in increasing order
+                actions (list): action to play in each of them
+            Returns:
+                list: status of the move of each game
+        """
+        self.observe(games)
+        statuses, known = zip(*(self.games[k].apply_action(action) for k, action in zip(games, actions)))
+        self.add_bacteria(games)
+
+        changed = [k for k, found in zip(games, known) if found is None]
+        found = dict(zip(changed, self.scan(changed, False)[0])) if changed else {}
+        for k, game_found in zip(games, known):
+            self.games[k].end_turn(found.get(k, game_found))
+        return list(statuses)
+
+    def bacteria_move(self, games):
+        """Moves the bacteria of the given games, all at once in fast mode and game after game in compat mode, whose
+            moves depend on each other in list order
+        """
+        games = [k for k in games if len(self.games[k].bacteria)]
+        if self.bacteria_mode != "fast":
+            for k in games:
+                self.games[k].bacteria_move()
+            return
+        if not games:
+            return
+
+        # GameCore.bacteria_move_fast on the whole stack: bacteria of different games never compete for a cell, so
+        # the earliest bacterium in the concatenated lists that picks a cell is the earliest one of its game
+        old = [self.games[k].bacteria.positions() for k in games]
+        bits = [self.games[k].streams.move_bits(len(flat)) for k, flat in zip(games, old)]
+        offset = np.repeat(np.array(games) * self.total_cells, [len(flat) for flat in old])
+        flat = np.concatenate(old) + offset
+        nbr = self.games[0].torus.neighbor_idx[flat - offset] + offset[:, None]
+        new_flat = move_bacteria_at_once(self.board, flat, nbr, np.concatenate(bits))
+        new_flat -= offset
+
+        start = 0
+        for k, game_old in zip(games, old):
+            game_new = new_flat[start:start + len(game_old)]
+            start += len(game_old)
+            moved = game_new != game_old
+            self.games[k].free_cells.sync(np.concatenate([game_old[moved], game_new[moved]]))
+            self.games[k].bacteria.move_to(game_new)
+
+    def add_bacteria(self, games):
+        """Spawns the missing bacteria of the given games, finding the free cells of the compat games in one pass"""
+        if self.bacteria_mode == "fast":
+            for k in games:
+                self.games[k].add_bacteria()
+            return
+
+        missing = [k for k in games if self.games[k].bacteria_target() > len(self.games[k].bacteria)]
+        if missing:
+            free = self.split(np.flatnonzero(self.map_state[missing] == 0), list(range(len(missing))))
+            for k, game_free in zip(missing, free):
+                self.games[k].add_bacteria(game_free)
@@ -0,0 +1,132 @@
+import io
+import os
+import json
+import pickle
+import numpy as np
+
+CHECKPOINT_VERSION = 2
+# arrays of GameCore.last_turn, which the percept of the next turn builds its delta from
+LAST_TURN_ARRAYS = ("last_periphery", "last_movable", "last_eaten", "last_retract", "last_move")
+
+
+class PlayerPickler(pickle.Pickler):
+    def __init__(self, file, rng):
+        """Pickles a player, leaving out the random number generator it shares with the game"""
+        super().__init__(file)
+        self.rng = rng
+
+    def persistent_id(self, obj):
+        return "rng" if obj is self.rng else None
+
+
+class PlayerUnpickler(pickle.Unpickler):
+    def __init__(self, file, rng):
+        """Unpickles a player, giving it the generator of the game it is restored into"""
+        super().__init__(file)
+        self.rng = rng
+
+    def persistent_load(self, pid):
+        if pid != "rng":
+            raise pickle.UnpicklingError("Unknown persistent id {}".format(pid))
+        return self.rng
+
+
+def save_checkpoint(core, path, player=None):
+    """Writes the state of a game between two turns to a compressed .npz file
+
+        The file holds the cells of the board that are not empty, the bacteria and the free cell pool in their
+        current order, the counters and the state of the random number generators, which is everything that decides
+        how the game goes on, what the last turn changed, which the delta of the next percept is built from, and the
+        player if one is given. It is written next to path first and then moved over it, so an interrupted write
+        never leaves a broken checkpoint behind.
+
+        Args:
+            core (GameCore): game to save, between two turns
+            path (str): file to write
+            player (object): player to pickle along with the game, or None
+    """
+    meta = {
+        "version": CHECKPOINT_VERSION,
+        "metabolism": core.metabolism,
+        "start_size": core.start_size,
+        "density": core.density,
+        "bacteria_mode": core.bacteria_mode,
+        "backend": core.backend,
+        "map_dim": core.map_dim,
+        "amoeba_size": core.amoeba_size,
+        "goal_size": core.goal_size,
+        "goal_reached": core.goal_reached,
+        "turns": core.turns,
+        "player_byte": core.player_byte,
+        "rng": core.streams.get_state(),
+    }
+    cells, values = core.board_cells()
+    arrays = {
+        "meta": np.array(json.dumps(meta)),
+        "cells": cells.astype(np.int32),
+        "values": values.astype(np.int8),
+        "bacteria": core.bacteria.positions().astype(np.int32),
+        "free_cells": core.free_cells.positions().astype(np.int32),
+    }
+    if core.last_turn is not None:
+        arrays.update((name, flat.astype(np.int32)) for name, flat in zip(LAST_TURN_ARRAYS, core.last_turn))
+    if player is not None:
+        buffer = io.BytesIO()
+        PlayerPickler(buffer, core.rng).dump(player)
+        arrays["player"] = np.frombuffer(buffer.getvalue(), dtype=np.uint8)
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path + ".tmp", "wb") as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(path + ".tmp", path)
+
+
+def load_checkpoint(core, path):
+    """Restores a game written by save_checkpoint into core, which then plays on exactly as the saved game would
+
+        Args:
+            core (GameCore): game to overwrite, keeping its buffers and its player generator object, on a board of the
+                size the checkpoint was written on; a game of the other backend goes on as a compat game would,
+                but fast games draw their new bacteria differently
+            path (str): checkpoint file
+        Returns:
+            object: the pickled player, or None if the checkpoint holds none
+    """
+    with np.load(path) as data:
+        meta = json.loads(str(data["meta"]))
+        if meta["version"] != CHECKPOINT_VERSION:
+            raise ValueError("Unsupported checkpoint version {} in {}".format(meta["version"], path))
+        if meta["map_dim"] != core.map_dim:
+            raise ValueError("Checkpoint {} holds a {}x{} board, the game is played on {}x{}".format(
+                path, meta["map_dim"], meta["map_dim"], core.map_dim, core.map_dim))
+
+        core.metabolism = meta["metabolism"]
+        core.start_size = meta["start_size"]
+        core.density = meta["density"]
+        core.bacteria_mode = meta["bacteria_mode"]
+        core.amoeba_size = meta["amoeba_size"]
+        core.goal_size = meta["goal_size"]
+        core.goal_reached = meta["goal_reached"]
+        core.turns = meta["turns"]
+        core.player_byte = meta["player_byte"]
+        core.streams.set_state(meta["rng"])
+
+        core.load_board(data["cells"].astype(int), data["values"])
+        core.bacteria.clear()
+        core.bacteria.add(data["bacteria"].astype(int))
+        if meta["backend"] == core.backend:
+            core.free_cells.load(data["free_cells"].astype(int))
+        else:
+            core.free_cells.reset()
+        core.last_turn = None
+        if LAST_TURN_ARRAYS[0] in data:
+            core.last_turn = tuple(data[name].astype(int) for name in LAST_TURN_ARRAYS)
+        player = None
+        if "player" in data:
+            player = PlayerUnpickler(io.BytesIO(data["player"].tobytes()), core.rng).load()
+
+    core.current_percept = None
+    core.after_last_move = core.get_periphery_info(False)
+    return player
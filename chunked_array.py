@@ -0,0 +1,149 @@
+import numpy as np
+
+# chunk number above every real chunk, kept at the end of the sorted chunk numbers so that a search always lands
+# on an entry
+SENTINEL = np.iinfo(np.int64).max
+
+
+class ChunkedArray:
+    def __init__(self, size, fill=0, dtype=int, chunk_bits=4):
+        """Flat array of size entries that only stores the chunks holding an entry other than fill
+
+            Indices are split into chunks of 2 ** chunk_bits consecutive entries, and each chunk in use is a row of
+            a pool array. Many indices are looked up at once by a binary search in the sorted chunk numbers, so
+            reads and writes stay vectorised, while single entries go through a dict. A chunk whose entries all
+            return to fill gives its row back, so memory and time follow the number of entries that are set
+            rather than size.
+
+            Args:
+                size (int): number of entries
+                fill (int): value of every entry that was never set
+                dtype (numpy dtype): type of the entries
+                chunk_bits (int): base 2 logarithm of the number of entries in a chunk
+        """
+        self.size = size
+        self.fill_value = fill
+        self.dtype = np.dtype(dtype)
+        self.shift = chunk_bits
+        self.mask = (1 << chunk_bits) - 1
+        # row 0 always holds fill and stands for every chunk that is not in use
+        self.pool = np.full((16, 1 << chunk_bits), fill, dtype=self.dtype)
+        self.count = np.zeros(16, dtype=int)
+        self.chunk_of = np.full(16, -1, dtype=np.int64)
+        self.free_rows = list(range(15, 0, -1))
+        # chunk numbers in use in increasing order followed by SENTINEL, and the row of each
+        self.keys = np.array([SENTINEL], dtype=np.int64)
+        self.rows = np.zeros(1, dtype=int)
+        self.row_of = {}
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            index = int(index)
+            return self.pool[self.row_of.get(index >> self.shift, 0), index & self.mask]
+
+        index = np.asarray(index)
+        chunk = index >> self.shift
+        pos = np.searchsorted(self.keys, chunk)
+        rows = np.where(self.keys[pos] == chunk, self.rows[pos], 0)
+        return self.pool[rows, index & self.mask]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, (int, np.integer)):
+            self.set_one(int(index), value)
+            return
+
+        index = np.asarray(index)
+        if not index.size:
+            return
+        chunk = index >> self.shift
+        pos = np.searchsorted(self.keys, chunk)
+        missing = self.keys[pos] != chunk
+        if missing.any():
+            self.allocate(np.unique(chunk[missing]))
+            pos = np.searchsorted(self.keys, chunk)
+        rows = self.rows[pos]
+        self.pool[rows, index & self.mask] = value
+
+        rows = np.unique(rows)
+        self.count[rows] = np.count_nonzero(self.pool[rows] != self.fill_value, axis=1)
+        emptied = rows[self.count[rows] == 0]
+        if len(emptied):
+            self.release(emptied)
+
+    def set_one(self, index, value):
+        chunk = index >> self.shift
+        row = self.row_of.get(chunk)
+        if row is None:
+            if value == self.fill_value:
+                return
+            self.allocate(np.array([chunk], dtype=np.int64))
+            row = self.row_of[chunk]
+
+        was_set = self.pool[row, index & self.mask] != self.fill_value
+        self.pool[row, index & self.mask] = value
+        self.count[row] += int(self.pool[row, index & self.mask] != self.fill_value) - int(was_set)
+        if self.count[row] == 0:
+            self.release(np.array([row]))
+
+    def allocate(self, chunks):
+        """Gives a row of fill to each of the sorted chunk numbers, none of which may be in use"""
+        while len(self.free_rows) < len(chunks):
+            grown = len(self.pool)
+            self.pool = np.concatenate([self.pool, np.full_like(self.pool, self.fill_value)])
+            self.count = np.concatenate([self.count, np.zeros(grown, dtype=int)])
+            self.chunk_of = np.concatenate([self.chunk_of, np.full(grown, -1, dtype=np.int64)])
+            self.free_rows[:0] = range(2 * grown - 1, grown - 1, -1)
+
+        rows = np.array(self.free_rows[len(self.free_rows) - len(chunks):][::-1], dtype=int)
+        del self.free_rows[len(self.free_rows) - len(chunks):]
+        self.chunk_of[rows] = chunks
+        pos = np.searchsorted(self.keys, chunks)
+        self.keys = np.insert(self.keys, pos, chunks)
+        self.rows = np.insert(self.rows, pos, rows)
+        self.row_of.update(zip(chunks.tolist(), rows.tolist()))
+
+    def release(self, rows):
+        """Returns rows that only hold fill to the free rows"""
+        chunks = self.chunk_of[rows]
+        pos = np.searchsorted(self.keys, chunks)
+        self.keys = np.delete(self.keys, pos)
+        self.rows = np.delete(self.rows, pos)
+        for chunk in chunks.tolist():
+            del self.row_of[chunk]
+        self.chunk_of[rows] = -1
+        self.free_rows.extend(rows.tolist())
+
+    def fill(self, value):
+        """Sets every entry to value, which becomes the fill of the array, and gives back every chunk"""
+        self.fill_value = value
+        self.pool.fill(value)
+        self.count.fill(0)
+        self.chunk_of.fill(-1)
+        self.free_rows = list(range(len(self.pool) - 1, 0, -1))
+        self.keys = np.array([SENTINEL], dtype=np.int64)
+        self.rows = np.zeros(1, dtype=int)
+        self.row_of = {}
+
+    def copy(self):
+        other = ChunkedArray.__new__(ChunkedArray)
+        other.__dict__.update(self.__dict__)
+        other.pool = self.pool.copy()
+        other.count = self.count.copy()
+        other.chunk_of = self.chunk_of.copy()
+        other.free_rows = list(self.free_rows)
+        other.row_of = dict(self.row_of)
+        return other
+
+    def indices(self):
+        """Returns the indices of the entries that differ from fill, in increasing order"""
+        rows, offset = np.nonzero(self.pool[self.rows[:-1]] != self.fill_value)
+        return (self.keys[:-1][rows] << self.shift) + offset
+
+    def __array__(self, dtype=None, copy=None):
+        dense = np.full(self.size, self.fill_value, dtype=self.dtype)
+        index = self.indices()
+        dense[index] = self[index]
+        return dense if dtype is None else dense.astype(dtype)
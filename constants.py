@@ -2,6 +2,8 @@ map_dim = 100
 total_cells = 10000
 
 possible_players = ["d"] + list(map(str, range(1, 10)))
+# players written for the 100x100 board, which break on a board of any other size
+fixed_map_players = ["1", "2", "3", "4", "5", "8"]
 
 vis_width = 960
 vis_height = 720
@@ -0,0 +1,87 @@
+import numpy as np
+
+
+class FreeCellPool:
+    def __init__(self, board):
+        """Set of the empty cells of the board that supports uniform sampling without replacement
+
+            The free cells are kept as flat board indices (x * map_dim + y) in the first count entries of an array,
+            with a board sized array mapping every cell to its entry. Cells are added at the end and removed by
+            moving the last entries into the holes, so every update and every draw costs time proportional to the
+            number of cells involved rather than to the size of the board.
+
+            Args:
+                board (numpy array): flat view of the map state, the pool holds the cells where it is 0
+        """
+        self.board = board
+        self.cells = np.zeros(len(board), dtype=int)
+        self.slot = np.full(len(board), -1, dtype=int)
+        self.count = 0
+        self.reset()
+
+    def __len__(self):
+        return self.count
+
+    def reset(self):
+        """Refills the pool with the empty cells of the board, dropping every cell it held"""
+        self.load(np.flatnonzero(self.board == 0))
+
+    def load(self, flat):
+        """Refills the pool with exactly the given free cells, in the given order"""
+        self.slot[self.cells[:self.count]] = -1
+        self.count = 0
+        self.add(flat)
+
+    def copy(self, board):
+        """Returns a copy of the pool that tracks board, a copy of the board this pool tracks"""
+        other = FreeCellPool.__new__(FreeCellPool)
+        other.board = board
+        other.cells = self.cells.copy()
+        other.slot = self.slot.copy()
+        other.count = self.count
+        return other
+
+    def positions(self):
+        """Returns the free cells in the order they are held in the pool"""
+        return self.cells[:self.count]
+
+    def add(self, flat):
+        end = self.count + len(flat)
+        self.cells[self.count:end] = flat
+        self.slot[flat] = np.arange(self.count, end)
+        self.count = end
+
+    def remove(self, flat):
+        """Removes distinct cells from the pool, all of which must be in it"""
+        end = self.count - len(flat)
+        removing = np.zeros(self.count - end, dtype=bool)
+        slots = self.slot[flat]
+        removing[slots[slots >= end] - end] = True
+        holes = slots[slots < end]
+        movers = self.cells[end:self.count][~removing]
+
+        self.cells[holes] = movers
+        self.slot[movers] = holes
+        self.slot[flat] = -1
+        self.count = end
+
+    def sync(self, flat):
+        """Brings the given cells, which may have changed state on the board, up to date in the pool"""
+        flat = np.unique(flat)
+        free = self.board[flat] == 0
+        pooled = self.slot[flat] >= 0
+        self.remove(flat[pooled & ~free])
+        self.add(flat[free & ~pooled])
+
+    def sample(self, rng, k):
+        """Draws k distinct free cells uniformly at random and removes them from the pool
+
+            Args:
+                rng (np.random.Generator): generator to draw from
+                k (int): number of cells to draw
+            Returns:
+                numpy array: flat board indices of the drawn cells
+        """
+        chosen = self.cells[rng.choice(self.count, replace=False, size=k)]
+        self.remove(chosen)
+        return chosen
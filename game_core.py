@@ -0,0 +1,677 @@
+import numpy as np
+import math
+from amoeba_state import AmoebaState, PerceptDelta
+from bacteria_store import BacteriaStore
+from free_cell_pool import FreeCellPool
+from move_validator import MoveValidator
+from random_streams import RandomStreams
+import constants
+import torus
+
+
+def movement_rules(free, bits):
+    """Applies the bacteria movement rules
+
+        A bacterium with exactly two free neighbours moves to one of them at random, one with three free neighbours
+        moves left or right if both up and down are free and up or down otherwise, and any other bacterium stays put.
+
+        Args:
+            free (numpy array): (n, 4) boolean array, whether the up, down, left and right neighbours are free
+            bits (numpy array): one random bit per bacterium, only read for the bacteria with two free neighbours
+        Returns:
+            numpy array: index of the chosen neighbour for each bacterium, -1 if it does not move
+    """
+    count = free.sum(axis=1)
+    first = free.argmax(axis=1)
+    last = 3 - free[:, ::-1].argmax(axis=1)
+    direction = np.full(len(free), -1, dtype=int)
+
+    two = count == 2
+    direction[two] = np.where(bits[two], last[two], first[two])
+    three = count == 3
+    direction[three] = np.where(free[three, 0] & free[three, 1], last[three], first[three])
+    return direction
+
+
+# bit of each direction in the pattern of free neighbours of a bacterium, and the direction movement_rules picks for
+# each of the 16 patterns with a random bit of 0 and of 1
+FREE_BITS = np.array([1, 2, 4, 8], dtype=np.uint8)
+FREE_PATTERNS = (np.arange(16)[:, None] >> np.arange(4) & 1).astype(bool)
+DIRECTIONS = np.stack([movement_rules(FREE_PATTERNS, np.zeros(16, dtype=int)),
+                       movement_rules(FREE_PATTERNS, np.ones(16, dtype=int))], axis=1)
+
+
+def choose_direction(free, bits):
+    """Applies the bacteria movement rules, see movement_rules
+
+        Args:
+            free (numpy array): (n, 4) boolean array, whether the up, down, left and right neighbours are free
+            bits (numpy array): one random bit per bacterium, only read for the bacteria with two free neighbours and
+                may be None if there are none
+        Returns:
+            numpy array: index of the chosen neighbour for each bacterium, -1 if it does not move
+    """
+    pattern = np.asarray(free, dtype=np.uint8) @ FREE_BITS
+    return DIRECTIONS[pattern, 0 if bits is None else bits]
+
+
+def move_bacteria_at_once(board, flat, nbr, bits):
+    """Moves bacteria simultaneously on a flat board, the earliest one getting a cell several of them pick
+
+        Shared by GameCore.bacteria_move_fast and BatchGameCore, which passes the flat stack of its boards with the
+        bacteria of every game shifted onto the board of their game.
+
+        Args:
+            board (numpy array): flat board, updated in place
+            flat (numpy array): flat index of every bacterium, in list order
+            nbr (numpy array): (n, 4) flat indices of the up, down, left and right neighbours of every bacterium
+            bits (numpy array): one random bit per bacterium
+        Returns:
+            numpy array: flat index of every bacterium after the move
+    """
+    direction = choose_direction(board[nbr] == 0, bits)
+    moving = np.flatnonzero(direction >= 0)
+    target = nbr[moving, direction[moving]]
+    target, first = np.unique(target, return_index=True)
+    moving = moving[first]
+
+    board[flat[moving]] = 0
+    board[target] = -1
+    new_flat = flat.copy()
+    new_flat[moving] = target
+    return new_flat
+
+
+def scan_periphery(board, nbr, find=True, edit=False):
+    """Finds the cells next to the periphery from the neighbours of the periphery cells
+
+        Shared by SparseGameCore and BatchGameCore, which passes the flat stack of its boards with the periphery of
+        every game shifted onto the board of their game.
+
+        Args:
+            board (numpy array): flat board
+            nbr (numpy array): (n, 4) flat indices of the up, down, left and right neighbours of the periphery
+                cells, taken in row-major order
+            find (bool): whether to find the eatable bacteria and free cells next to the periphery
+            edit (bool): whether to find the periphery cells that no longer touch an empty cell
+        Returns:
+            tuple: eatable bacteria and free cells next to the periphery as flat index arrays in percept order, None
+                if find is False, and a boolean array telling which periphery cells no longer touch an empty cell,
+                None if edit is False
+    """
+    values = board[nbr]
+    found = enclosed = None
+    if find:
+        # the neighbours of the periphery in row-major order, looking up, down, left and right, come in the order
+        # the players have always received the bacteria and free cells in, so the first time a cell shows up is
+        # its place in that order
+        reached = nbr[values < 1]
+        found = reached[np.sort(np.unique(reached, return_index=True)[1])]
+        found_values = board[found]
+        found = found[found_values == -1], found[found_values == 0]
+    if edit:
+        enclosed = ~(values == 0).any(axis=1)
+    return found, enclosed
+
+
+# attributes a clone shares with its original, the mutable ones are replaced by copies in GameCore.clone
+GAME_CORE_FIELDS = ["metabolism", "start_size", "amoeba_size", "goal_size", "goal_reached", "turns", "density",
+                    "bacteria_mode", "map_dim", "total_cells", "torus", "amoeba_map", "move_rank", "periphery_frame",
+                    "after_last_move", "current_percept", "last_turn", "player_byte"]
+
+
+class GameCore:
+    backend = "dense"
+
+    def __init__(self, rng, metabolism, size, density, bacteria_mode="compat", map_dim=constants.map_dim,
+                 map_state=None):
+        """The simulation of one game: the board, the bacteria, the random number generators and the turn counter
+
+            A GameCore never logs, renders or touches the filesystem, and clone() copies it cheaply, so that
+            search-based players and analysis tools can fork it and step the copies forward. AmoebaGame adds the
+            player, logging and rendering on top of it.
+
+            Args:
+                rng (RandomStreams or np.random.Generator): streams driving the bacteria, whose player generator
+                    is shared with the player, or a generator to use as legacy streams
+                metabolism (float): proportion of the amoeba that may be retracted in one turn
+                size (int): side of the initial amoeba square
+                density (float): proportion of the free cells holding bacteria
+                bacteria_mode (str): "compat" or "fast", see bacteria_move
+                map_dim (int): side of the board, every structure of the game is linear in the number of cells
+                map_state (numpy array): map_dim x map_dim int8 array to keep the board in, such as one board of
+                    a BatchGameCore, a new one by default
+        """
+        self.streams = rng if isinstance(rng, RandomStreams) else RandomStreams.shared(rng)
+        self.rng = self.streams.player
+        self.bacteria_mode = bacteria_mode
+        self.map_dim = map_dim
+        self.total_cells = map_dim * map_dim
+        self.torus = torus.get_torus(map_dim)
+        self.allocate_storage(map_state)
+        # live index of the flat positions holding value 2, kept in sync with every write to the board
+        self.periphery = set()
+        self.move_rank = self.new_cell_array(-1)
+
+        self.reset(metabolism, size, density)
+
+    def allocate_storage(self, map_state=None):
+        """Creates the board, the bacteria index and the free cell pool, the structures a backend stores its own way
+
+            Args:
+                map_state (numpy array): see __init__
+        """
+        self.bacteria = BacteriaStore(self.total_cells, self.map_dim)
+        # -1 bacterium, 0 empty, 1 amoeba interior, 2 amoeba periphery
+        self.map_state = np.zeros((self.map_dim, self.map_dim), dtype=np.int8) if map_state is None else map_state
+        # flat view of map_state, which the engine reads and writes through
+        self.board = self.map_state.ravel()
+        self.free_cells = FreeCellPool(self.board)
+        # flat index (x * map_dim + y) of the up, down, left and right neighbour of every cell
+        self.neighbor_idx = self.torus.neighbor_idx
+
+    def copy_storage(self, other):
+        """Gives a clone its own copy of the structures allocate_storage creates, the bacteria index aside"""
+        other.map_state = self.map_state.copy()
+        other.board = other.map_state.ravel()
+        other.free_cells = self.free_cells.copy(other.board)
+        other.neighbor_idx = self.neighbor_idx
+
+    def reset(self, metabolism, size, density):
+        """Starts a new game on the same board, bacteria and free cell buffers
+
+            The random number generator is left as it is, reseed it beforehand to replay a seeded game.
+
+            Args:
+                metabolism (float): proportion of the amoeba that may be retracted in one turn
+                size (int): side of the initial amoeba square
+                density (float): proportion of the free cells holding bacteria
+        """
+        self.metabolism = metabolism
+        self.start_size = size
+        self.amoeba_size = self.start_size ** 2
+        self.goal_size = self.amoeba_size * 4
+        self.goal_reached = False
+        self.turns = 0
+        self.density = density
+        self.bacteria.clear()
+        self.board.fill(0)
+        self.periphery.clear()
+        # 0/1 board of the amoeba, handed to percepts as a read-only view and copied before the next write
+        self.amoeba_map = None
+        self.amoeba_map_shared = False
+        # sorted periphery with its neighbour rows, shared by the percept after a move and the next pruning pass
+        self.periphery_frame = None
+
+        self.after_last_move = None
+        self.current_percept = None
+        # percept, eaten bacteria, retracted and extended cells of the turn last played, for the next delta
+        self.last_turn = None
+        self.player_byte = 0
+
+        self.initialize(size)
+
+    def initialize(self, sl):
+        corner = self.map_dim // 2 - (sl // 2)
+        for i in range(sl):
+            for j in range(sl):
+                cell = (corner + i) * self.map_dim + corner + j
+                if i == 0 or i == (sl - 1) or j == 0 or j == (sl - 1):
+                    self.board[cell] = 2
+                    self.periphery.add(cell)
+                else:
+                    self.board[cell] = 1
+
+        self.amoeba_map = self.amoeba_map_from_board()
+        self.free_cells.reset()
+        self.spawn_bacteria(self.bacteria_target())
+        self.after_last_move = self.get_periphery_info(False)
+
+    def neighbors_of(self, flat):
+        """Returns the up, down, left and right neighbours of the given flat board indices, along a new last axis"""
+        return self.neighbor_idx[flat]
+
+    def new_cell_array(self, fill):
+        """Returns an integer array over the flat board holding fill everywhere"""
+        return np.full(self.total_cells, fill, dtype=int)
+
+    def amoeba_map_from_board(self):
+        return (self.map_state > 0).astype(np.int8)
+
+    def board_cells(self):
+        """Returns the flat board indices of the cells that are not empty, in increasing order, and their values"""
+        cells = np.flatnonzero(self.board)
+        return cells, self.board[cells]
+
+    def load_board(self, cells, values):
+        """Replaces the board with the given cells and values, all other cells being empty, and rebuilds the
+            periphery index and the amoeba map from it
+        """
+        self.board.fill(0)
+        self.board[cells] = values
+        self.periphery = set(cells[values == 2].tolist())
+        self.amoeba_map = self.amoeba_map_from_board()
+        self.amoeba_map_shared = False
+        self.periphery_frame = None
+
+    def clone(self):
+        """Returns an independent game of the same backend in the same state, with its own copy of the random number
+            generators
+
+            The lookup tables are shared, the percepts already handed out are copied, and the amoeba map is shared
+            until either game writes to it.
+        """
+        # the clone is a bare engine of the backend, without what AmoebaGame adds on top of it
+        core_class = next(cls for cls in type(self).__mro__ if "backend" in cls.__dict__)
+        other = core_class.__new__(core_class)
+        other.__dict__.update({name: getattr(self, name) for name in GAME_CORE_FIELDS})
+        self.copy_storage(other)
+        other.periphery = self.periphery.copy()
+        other.bacteria = self.bacteria.copy()
+        other.streams = self.streams.copy()
+        other.rng = other.streams.player
+        self.copy_percepts(other)
+        self.amoeba_map_shared = other.amoeba_map_shared = True
+        return other
+
+    def copy_percepts(self, other):
+        """Gives a clone its own copies of the percepts, so that a player moving on it cannot change this game's"""
+        for name in ("after_last_move", "current_percept"):
+            percept = getattr(self, name)
+            setattr(other, name, None if percept is None else percept.copy())
+
+    def observe(self):
+        """Starts the current turn if needed, moving the bacteria and pruning the periphery
+
+            Returns:
+                AmoebaState: percept the move of this turn is decided on
+        """
+        if self.current_percept is None:
+            self.bacteria_move()
+            self.current_percept = self.with_delta(self.get_periphery_info(True))
+        return self.current_percept
+
+    def with_delta(self, percept):
+        """Sets the delta of the percept of a new turn from the turn last played, if any, and returns the percept"""
+        if self.last_turn is not None:
+            percept.delta = PerceptDelta(percept, *self.last_turn)
+            self.last_turn = None
+        return percept
+
+    def step(self, action):
+        """Plays the current turn with the given action
+
+            Args:
+                action (tuple): (retract, extend, info) as returned by a player's move
+            Returns:
+                str: "accepted" if the move was applied, "rejected" if it breaks the rules of movement and
+                    "invalid" if it does not follow the return format
+        """
+        status, found = self.apply_action(action)
+        self.add_bacteria()
+        self.end_turn(found)
+        return status
+
+    def apply_action(self, action):
+        """Eats the bacteria next to the periphery and applies the action, the part of step up to spawning
+
+            Args:
+                action (tuple): (retract, extend, info) as returned by a player's move
+            Returns:
+                tuple: the status returned by step, and the eatable bacteria and free cells of the percept after the
+                    move when they are already known, None when the board changed and they must be found again
+        """
+        before_state = self.observe()
+        self.current_percept = None
+        self.turns += 1
+
+        # the eatable bacteria join the amoeba before the move is checked, the board catches up in update_board
+        eaten = before_state.bacteria_idx
+        self.amoeba_size += len(eaten)
+        self.update_amoeba_map(eaten, 1)
+        retract = move = np.zeros(0, dtype=int)
+        status = "invalid"
+        if self.check_action(action):
+            retract, move, self.player_byte = action
+            retract, move = self.torus.to_flat(retract), self.torus.to_flat(move)
+            # a move that neither retracts nor extends is always legal
+            if not len(move) or self.check_move(retract, move, before_state.periphery_idx):
+                status = "accepted"
+            else:
+                status = "rejected"
+                retract = move = np.zeros(0, dtype=int)
+
+        self.update_board(eaten, retract, move)
+        # the arrays are never written to again, so the delta of the next turn and clones can share them
+        self.last_turn = (before_state.periphery_idx, before_state.movable_idx, eaten, retract, move)
+        # the percept after the move can only reuse what the percept of this turn found if the board does not
+        # change before it is built: nothing is eaten or moved, and add_bacteria, which runs in between, spawns
+        # nothing as no bacterium is missing
+        if len(eaten) or len(move) or self.bacteria_target() > len(self.bacteria):
+            return status, None
+        # an idle turn leaves the board as the percept of this turn saw it after pruning, and the pruned cells did
+        # not touch any free cell, so its free cells are still the ones next to the periphery
+        return status, (eaten, before_state.movable_idx)
+
+    def end_turn(self, found=None):
+        """Builds the percept after the move, the part of step after spawning
+
+            Args:
+                found (tuple): see get_periphery_info
+        """
+        self.goal_reached = self.amoeba_size >= self.goal_size
+        self.after_last_move = self.get_periphery_info(False, found)
+
+    def bacteria_move(self):
+        if not len(self.bacteria):
+            return
+
+        old = self.bacteria.positions()
+        if self.bacteria_mode == "fast":
+            flat = self.bacteria_move_fast(old)
+        else:
+            flat = self.bacteria_move_compat(old)
+
+        moved = flat != old
+        self.free_cells.sync(np.concatenate([old[moved], flat[moved]]))
+        self.bacteria.move_to(flat)
+
+    def bacteria_move_compat(self, flat):
+        """Moves every bacterium exactly as a sequential pass over self.bacteria would
+
+            A bacterium only senses its four neighbours, so its move can only depend on earlier bacteria at most two
+            steps away. Each round decides every bacterium whose such predecessors have all moved. Decisions that
+            need no randomness are applied right away, while bacteria with two free neighbours wait until every
+            earlier bacterium has been decided, so that their random numbers are drawn in one block and in list
+            order and the generator is consumed exactly as before.
+
+            Args:
+                flat (numpy array): flat board index of every bacterium, in list order
+            Returns:
+                numpy array: flat board index of every bacterium after the move
+        """
+        n = len(flat)
+        board = self.board
+        nbr = self.neighbors_of(flat)
+        order = np.arange(n)
+        owner = self.new_cell_array(-1)
+        owner[flat] = order
+        # every cell at most two steps away from each bacterium, the cells a bacterium move can touch
+        near = owner[np.concatenate([nbr, self.neighbors_of(nbr).reshape(-1, 16)], axis=1)]
+        pending = ((near >= 0) & (near < order[:, None])).sum(axis=1)
+        later = near > order[:, None]
+
+        counted = np.zeros(n, dtype=bool)
+        two_way = np.zeros(n, dtype=bool)
+        free = np.zeros((n, 4), dtype=bool)
+        new_flat = flat.copy()
+        ready = np.flatnonzero(pending == 0)
+        prefix = 0
+        while prefix < n:
+            free[ready] = board[nbr[ready]] == 0
+            counted[ready] = True
+            two_way[ready] = free[ready].sum(axis=1) == 2
+            apply = ready[~two_way[ready]]
+            direction = choose_direction(free[apply], None)
+
+            waiting = np.flatnonzero(~counted[prefix:])
+            end = prefix + waiting[0] if len(waiting) else n
+            drawn = prefix + np.flatnonzero(two_way[prefix:end])
+            prefix = end
+            if len(drawn):
+                apply = np.concatenate([apply, drawn])
+                direction = np.concatenate([direction, choose_direction(free[drawn],
+                                                                        self.streams.two_way_choices(len(drawn)))])
+
+            moving = direction >= 0
+            target = nbr[apply[moving], direction[moving]]
+            board[flat[apply[moving]]] = 0
+            board[target] = -1
+            new_flat[apply[moving]] = target
+
+            successors = near[apply][later[apply]]
+            pending -= np.bincount(successors, minlength=n)
+            ready = np.unique(successors[pending[successors] == 0])
+
+        return new_flat
+
+    def bacteria_move_fast(self, flat):
+        """Moves every bacterium at once, looking only at the board as it was at the start of the turn
+
+            The bacteria pick their direction with the same rules as the compatible mode, but simultaneously, and
+            when several of them pick the same cell the earliest one in the list gets it while the others stay put.
+
+            Args:
+                flat (numpy array): flat board index of every bacterium, in list order
+            Returns:
+                numpy array: flat board index of every bacterium after the move
+        """
+        return move_bacteria_at_once(self.board, flat, self.neighbors_of(flat), self.streams.move_bits(len(flat)))
+
+    def get_periphery_frame(self):
+        """Returns the periphery cells as a sorted flat index array and as a set of (x, y) tuples
+
+            The periphery only changes in update_board and when pruning, so the frame built for the percept after a
+            move is reused by the pruning pass of the next turn, after the bacteria have moved.
+        """
+        if self.periphery_frame is None:
+            # sorting the live index gives the same row-major order as scanning the board
+            periphery = np.array(sorted(self.periphery), dtype=int)
+            self.periphery_frame = (periphery, set(self.torus.to_cells(periphery)))
+        return self.periphery_frame
+
+    def get_periphery_info(self, edit, found=None, removed=None):
+        """Builds the percept of the current board
+
+            Args:
+                edit (bool): whether to turn the periphery cells that no longer touch an empty cell into interior
+                found (tuple): eatable bacteria and free cells next to the periphery, as flat index arrays in percept
+                    order, when the caller already knows them; they are found from the board otherwise
+                removed (numpy array): periphery cells that no longer touch an empty cell in increasing order when
+                    the caller already knows them, only read if edit is True
+            Returns:
+                AmoebaState: percept holding both the (x, y) cell lists and their flat index arrays
+        """
+        periphery, periphery_set = self.get_periphery_frame()
+        board = self.map_state
+
+        # players have always received the bacteria and free cells in the order a scan of the periphery in
+        # row-major order, looking up, down, left and right, first reaches them. Cell q is reached from the
+        # periphery cell p that has it as neighbour in direction d, i.e. the neighbour of q in the opposite
+        # direction, so the smallest 4 * p + d over the four directions gives its position in that order.
+        if found is None:
+            unreached = 4 * self.total_cells
+            owner = np.where(board == 2, self.torus.flat_index, self.total_cells)
+            first = np.full(board.shape, unreached)
+            for direction in range(4):
+                np.minimum(first, 4 * self.torus.shifted(owner, torus.OPPOSITE[direction]) + direction, out=first)
+            found = np.flatnonzero((first < unreached) & (board < 1))
+            found = found[np.argsort(first.flat[found])]
+            values = board.flat[found]
+            found = found[values == -1], found[values == 0]
+        eatable_bacteria, movable_cells = found
+
+        if not edit:
+            removed = np.zeros(0, dtype=int)
+        elif removed is None:
+            removed = np.flatnonzero((board == 2) & ~self.torus.neighbor_values(board == 0).any(axis=0))
+        if len(removed):
+            board.flat[removed] = 1
+            self.periphery.difference_update(removed.tolist())
+
+        # players have always received the periphery in the iteration order of a set of (x, y) tuples
+        periphery_cells = list(periphery_set.difference(set(self.torus.to_cells(removed))))
+        if len(removed):
+            periphery = periphery[board.flat[periphery] == 2]
+            self.periphery_frame = None
+
+        amoeba = self.amoeba_map.view()
+        amoeba.flags.writeable = False
+        self.amoeba_map_shared = True
+
+        for flat in (periphery, eatable_bacteria, movable_cells):
+            flat.flags.writeable = False
+
+        return AmoebaState(self.amoeba_size, amoeba, periphery_cells, self.torus.to_cells(eatable_bacteria),
+                           self.torus.to_cells(movable_cells), periphery_idx=periphery,
+                           bacteria_idx=eatable_bacteria, movable_idx=movable_cells, map_dim=self.map_dim)
+
+    def update_amoeba_map(self, cells, value):
+        if not len(cells):
+            return
+        if self.amoeba_map_shared:
+            self.amoeba_map = self.amoeba_map.copy()
+            self.amoeba_map_shared = False
+        self.amoeba_map.flat[cells] = value
+
+    def check_action(self, action):
+        if not action:
+            return False
+        if type(action) is not tuple:
+            return False
+        if len(action) != 3:
+            return False
+        if type(action[2]) is not int:
+            return False
+        if action[2] < 0 or action[2] >= 256:
+            return False
+        if type(action[0]) is not list or type(action[1]) is not list:
+            return False
+        if len(action[0]) != len(set(action[0])) or len(action[1]) != len(set(action[1])):
+            return False
+        if len(action[0]) != len(action[1]) or len(action[0]) > math.ceil(self.metabolism * self.amoeba_size):
+            return False
+
+        return True
+
+    def check_move(self, retract, move, periphery):
+        """Checks that a move only retracts periphery cells, only extends into free cells next to the amoeba that
+            remains, and keeps the amoeba in one piece
+
+            The move is checked against self.amoeba_map, which already holds the bacteria eaten this turn while the
+            board still shows them as bacteria.
+
+            Args:
+                retract (numpy array): flat board indices of the retracted cells, -1 for cells off the board
+                move (numpy array): flat board indices of the cells moved into, -1 for cells off the board
+                periphery (numpy array): flat board indices of the periphery cells
+            Returns:
+                bool: True if the move is legal
+        """
+        return MoveValidator(self.amoeba_map > 0, periphery).check(retract, move)
+
+    def update_board(self, eaten, retract, move):
+        """Brings the board, the periphery index and the free cell pool up to date with a whole turn in one pass,
+            reclassifying the interior (1) and periphery (2) cells around the changes
+
+            The eaten bacteria join the periphery. The move gives the same result as placing the cells one at a
+            time: interior cells next to a retracted cell join the periphery, and a periphery cell next to an
+            extension becomes interior once none of its neighbours is empty or a bacterium. As the check used to run
+            each time a neighbouring extension was placed, an extended cell only qualifies if one of its neighbours
+            is extended after it.
+
+            Args:
+                eaten (numpy array): flat board indices of the bacteria eaten this turn, already in self.amoeba_map
+                retract (numpy array): flat board indices of the retracted cells, empty if the move was rejected
+                move (numpy array): flat board indices of the cells moved into, in the order the player gave them
+        """
+        if not len(eaten) and not len(move):
+            return
+        self.update_amoeba_map(retract, 0)
+        self.update_amoeba_map(move, 1)
+        self.periphery_frame = None
+        board = self.board
+
+        for p in eaten.tolist():
+            self.bacteria.remove(p)
+        board[eaten] = 2
+        self.periphery.update(eaten.tolist())
+        if not len(move):
+            return
+
+        board[retract] = 0
+        self.periphery.difference_update(retract.tolist())
+        exposed = np.unique(self.neighbors_of(retract))
+        exposed = exposed[board[exposed] == 1]
+        board[exposed] = 2
+        self.periphery.update(exposed.tolist())
+
+        board[move] = 2
+        self.periphery.update(move.tolist())
+        rank = self.move_rank
+        rank[move] = np.arange(len(move))
+        touched = np.unique(self.neighbors_of(move))
+        nbr = self.neighbors_of(touched)
+        enclosed = (board[nbr] >= 1).all(axis=1)
+        placed_before_last_neighbor = rank[touched] < rank[nbr].max(axis=1)
+        interior = touched[(board[touched] == 2) & enclosed & placed_before_last_neighbor]
+        board[interior] = 1
+        self.periphery.difference_update(interior.tolist())
+        rank[move] = -1
+
+        self.free_cells.sync(np.concatenate([retract, move]))
+
+    def bacteria_target(self):
+        """Returns the number of bacteria on the board once the missing ones have spawned"""
+        return math.floor(self.density * (self.total_cells - self.amoeba_size))
+
+    def add_bacteria(self, free=None):
+        self.spawn_bacteria(self.bacteria_target() - len(self.bacteria), free)
+
+    def spawn_bacteria(self, k, free=None):
+        """Places k new bacteria on free cells drawn at random
+
+            Args:
+                k (int): number of bacteria to place
+                free (numpy array): flat indices of every free cell in increasing order, found from the board if None,
+                    only read in compat mode
+        """
+        # drawing no cells leaves the generator untouched, so skipping the draw keeps seeded games the same
+        if k <= 0:
+            return
+        if self.bacteria_mode == "fast":
+            new_bacteria = self.free_cells.sample(self.streams.spawn, k)
+        else:
+            # the same draw as picking from the list of free cells in row-major order, as earlier versions did
+            if free is None:
+                free = np.flatnonzero(self.board == 0)
+            new_bacteria = free[self.streams.choice(len(free), k)]
+            self.free_cells.remove(new_bacteria)
+
+        self.bacteria.add(new_bacteria)
+        self.board[new_bacteria] = -1
+
+    def growth_bound(self, turns):
+        """Upper bound on how much the amoeba can grow in the given number of turns, whatever the player does
+
+            The amoeba only grows by eating bacteria next to its periphery. The amoeba is connected and never
+            shrinks, so there are never more bacteria than now and the cells next to an amoeba of n cells are at
+            most 2n + 2. The first turn also cannot eat more than the cells next to the current periphery.
+
+            Args:
+                turns (int): number of turns left to play
+            Returns:
+                int: number of cells the amoeba can gain at most
+        """
+        bacteria = max(len(self.bacteria), self.bacteria_target())
+        size = self.amoeba_size
+        reach = min((3 if size > 1 else 4) * len(self.periphery), 2 * size + 2)
+        # the cells next to the amoeba at most double each turn, until there are more of them than bacteria
+        while turns > 0 and reach < bacteria:
+            size += reach
+            turns -= 1
+            reach = 2 * size + 2
+        return size - self.amoeba_size + max(turns, 0) * bacteria
+
+    def goal_reachable(self, turns):
+        """Returns False when the amoeba cannot reach the goal size in the given number of turns"""
+        return self.amoeba_size + self.growth_bound(turns) >= self.goal_size
+
+    def get_state(self):
+        return_dict = dict()
+        return_dict['amoeba_size'] = self.amoeba_size
+        return_dict['turns'] = self.turns
+        return_dict['bacteria'] = self.bacteria.coords()
+        return_dict['map_state'] = np.copy(self.map_state)
+        return return_dict
+
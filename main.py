@@ -1,5 +1,5 @@
 import argparse
-from amoeba_game import AmoebaGame
+from amoeba_game import AmoebaGame, SparseAmoebaGame
 
 if __name__ == '__main__':
     parser = argparse.ArgumentParser()
@@ -9,10 +9,35 @@ if __name__ == '__main__':
     parser.add_argument("--size", "-A", type=int, default=15, help="length of a side of the initial amoeba square "
                                                                    "(min=3, max=50")
     parser.add_argument("--final", "-l", type=int, default=1000, help="the maximum number of days")
+    parser.add_argument("--play_out", action="store_true", help="Play every turn up to --final even once the goal "
+                                                                "size can no longer be reached")
     parser.add_argument("--density", "-d", type=float, default=0.3, help="Density of bacteria on the map")
     parser.add_argument("--seed", "-s", type=int, default=2, help="Seed used by random number generator, specify 0 to "
                                                                   "use no seed and have different random behavior on "
                                                                   "each launch")
+    parser.add_argument("--map_dim", type=int, default=100, help="length of a side of the toroidal board, players "
+                                                                 "1 to 5 and 8 only play on the 100x100 board")
+    parser.add_argument("--backend", default="dense", choices=["dense", "sparse"],
+                        help="dense keeps the whole board in arrays, sparse only stores the cells in use so that a "
+                             "turn costs time in proportion to the amoeba and the bacteria, for large boards with "
+                             "few bacteria")
+    parser.add_argument("--bacteria_mode", "-b", default="compat", choices=["compat", "fast"],
+                        help="compat moves and spawns bacteria exactly as earlier versions did, reproducing their seeded "
+                             "games, fast moves them all at once and spawns them from a pool of free cells for large "
+                             "sweeps")
+    parser.add_argument("--rng_mode", default="legacy", choices=["legacy", "streams"],
+                        help="legacy draws the player and the bacteria from one generator as earlier versions did, "
+                             "reproducing their seeded games, streams gives the player, the bacteria motion and the "
+                             "bacteria spawning independent generators spawned from the seed")
+    parser.add_argument("--checkpoint_every", type=int, default=0, help="Write a checkpoint of the game every this many "
+                                                                        "turns, 0 to write none")
+    parser.add_argument("--checkpoint_dir", default="checkpoints", help="Directory the checkpoints are written to")
+    parser.add_argument("--checkpoint_keep", type=int, default=2, help="Number of most recent checkpoints kept on disk")
+    parser.add_argument("--checkpoint_player", action="store_true", help="Pickle the player into every checkpoint so "
+                                                                         "that its state is restored too")
+    parser.add_argument("--resume", default=None, help="Checkpoint file to resume the game from, the game options "
+                                                       "stored in it replace -m, -A, -d and -b, --map_dim must match "
+                                                       "the board it was written on")
     parser.add_argument("--port", type=int, default=8080, help="Port to start, specify -1 to auto-assign")
     parser.add_argument("--address", "-a", type=str, default="127.0.0.1", help="Address")
     parser.add_argument("--no_browser", "-nb", action="store_true", help="Disable browser launching in GUI mode")
@@ -30,4 +55,7 @@ if __name__ == '__main__':
         if args.log_path == "log":
             args.log_path = "results.log"
 
-    amoeba_game = AmoebaGame(args)
+    if args.backend == "sparse":
+        amoeba_game = SparseAmoebaGame(args)
+    else:
+        amoeba_game = AmoebaGame(args)
@@ -0,0 +1,204 @@
+import numpy as np
+import torus
+
+# batches at least this large find the cut vertices of the amoeba up front, as a single Tarjan pass is then cheaper
+# than searching the amoeba for every proposal that retracts one cell
+CUT_VERTEX_BATCH = 8
+
+
+class MoveValidator:
+    def __init__(self, amoeba, periphery, neighbor_idx=None):
+        """Checks (retract, extend) proposals against one state of the amoeba
+
+            Everything that only depends on the state, the masks of the amoeba and of its periphery and the cut
+            vertices of the amoeba, is computed once and shared between all the proposals checked.
+
+            The cells are those of the board by default. Given a neighbour table, they can be any set of cells
+            instead, such as the amoeba and its surroundings numbered from 0, with every neighbour outside the set
+            pointing to a last cell that is outside the amoeba.
+
+            Args:
+                amoeba (numpy array): map_dim x map_dim boolean mask of the amoeba the move applies to, including
+                    the bacteria it eats this turn, or a flat mask over the cells of neighbor_idx
+                periphery (numpy array): indices of the periphery cells that may be retracted
+                neighbor_idx (numpy array): up, down, left and right neighbour of every cell of a flat amoeba mask,
+                    the neighbours on the board by default
+        """
+        amoeba = np.asarray(amoeba, dtype=bool)
+        self.torus = torus.get_torus(amoeba.shape[0]) if amoeba.ndim == 2 else None
+        self.neighbor_idx = self.torus.neighbor_idx if neighbor_idx is None else neighbor_idx
+        self.amoeba = amoeba.ravel()
+        total_cells = len(self.amoeba)
+        self.is_periphery = np.zeros(total_cells, dtype=bool)
+        self.is_periphery[periphery] = True
+        self.is_retracted = np.zeros(total_cells, dtype=bool)
+        self.visited = np.zeros(total_cells, dtype=bool)
+        self.is_target = np.zeros(total_cells, dtype=bool)
+        # articulation point map of the amoeba, see get_safe_retract
+        self.safe_retract = None
+
+    @classmethod
+    def from_percept(cls, state):
+        """Builds the validator for the move a player is about to return
+
+            Args:
+                state (AmoebaState): current percept, whose bacteria are eaten before the move is applied
+        """
+        amoeba = np.asarray(state.amoeba_map) > 0
+        board = torus.get_torus(amoeba.shape[0])
+        bacteria = state.bacteria_idx if state.bacteria_idx is not None else board.to_flat(state.bacteria)
+        periphery = state.periphery_idx if state.periphery_idx is not None else board.to_flat(state.periphery)
+        amoeba.flat[bacteria] = True
+        return cls(amoeba, periphery)
+
+    def check_moves(self, proposals):
+        """Checks a batch of proposals, giving the same answer as AmoebaGame.check_move for each of them
+
+            The format and metabolism limits enforced by AmoebaGame.check_action are not checked here.
+
+            Args:
+                proposals (list): (retract, extend) pairs, each a list of (x, y) cells
+            Returns:
+                numpy array: boolean array, True for every legal proposal
+        """
+        if len(proposals) >= CUT_VERTEX_BATCH:
+            self.get_safe_retract()
+        to_flat = self.torus.to_flat
+        return np.array([self.check(to_flat(retract), to_flat(move)) for retract, move in proposals], dtype=bool)
+
+    def check(self, retract, move):
+        """Checks that a move only retracts periphery cells, only extends into free cells next to the amoeba that
+            remains, and keeps the amoeba in one piece
+
+            Args:
+                retract (numpy array): indices of the retracted cells, -1 for cells off the board
+                move (numpy array): indices of the cells moved into, -1 for cells off the board
+            Returns:
+                bool: True if the move is legal
+        """
+        if (retract < 0).any() or (move < 0).any() or not self.is_periphery[retract].all():
+            return False
+
+        # an extension must be a retracted cell or a cell outside the amoeba next to a periphery cell that stays
+        is_retracted = self.is_retracted
+        is_retracted[retract] = True
+        nbr = self.neighbor_idx[move]
+        stays = (self.is_periphery[nbr] & ~is_retracted[nbr]).any(axis=1)
+        movable = is_retracted[move] | (~self.amoeba[move] & stays)
+        is_retracted[retract] = False
+        if not movable.all():
+            return False
+
+        # cells that are retracted and not moved back into
+        removed = np.setdiff1d(retract, move)
+
+        # the amoeba is connected before the move and every extension touches a cell that is not retracted, so
+        # only the retractions can disconnect it
+        if len(removed) == 0:
+            return True
+        if len(removed) == 1 and self.safe_retract is not None and self.safe_retract[removed[0]]:
+            return True
+
+        amoeba = self.amoeba.copy()
+        amoeba[removed] = False
+        amoeba[move] = True
+
+        # every component left after the move holds a remaining neighbour of a retracted cell or an extension,
+        # so the search can stop as soon as all of those are reached
+        boundary = self.neighbor_idx[removed].ravel()
+        targets = np.union1d(boundary[amoeba[boundary]], move)
+        if len(targets) == 0:
+            return self.is_connected(amoeba)
+
+        return self.is_connected(amoeba, targets)
+
+    def is_connected(self, amoeba, targets=None):
+        """Breadth-first search over the flattened board, one whole frontier per step
+
+            Args:
+                amoeba (numpy array): flat boolean mask of the amoeba cells
+                targets (numpy array): flat indices of amoeba cells that must be connected to each other, defaults
+                    to every amoeba cell; the search stops as soon as all of them are reached
+            Returns:
+                bool: True if all the target cells are reachable from the first one
+        """
+        if targets is None:
+            targets = np.flatnonzero(amoeba)
+            if len(targets) == 0:
+                return True
+            is_target = amoeba
+        else:
+            is_target = self.is_target
+            is_target.fill(False)
+            is_target[targets] = True
+
+        visited = self.visited
+        visited.fill(False)
+        frontier = targets[:1]
+        visited[frontier] = True
+        remaining = len(targets) - 1
+        while len(frontier) and remaining:
+            nbr = self.neighbor_idx[frontier].ravel()
+            nbr = np.unique(nbr[amoeba[nbr] & ~visited[nbr]])
+            visited[nbr] = True
+            remaining -= np.count_nonzero(is_target[nbr])
+            frontier = nbr
+
+        return remaining == 0
+
+    def get_safe_retract(self):
+        """Marks the amoeba cells that can be retracted on their own without splitting the amoeba
+
+            Runs a single iterative Tarjan pass over the 4-connected toroidal amoeba the first time it is called and
+            caches the result in self.safe_retract.
+
+            Returns:
+                numpy array: flat boolean mask, True for every amoeba cell that is not an articulation point
+        """
+        if self.safe_retract is not None:
+            return self.safe_retract
+
+        cells = np.flatnonzero(self.amoeba)
+        local = np.full(len(self.amoeba), -1, dtype=int)
+        local[cells] = np.arange(len(cells))
+        nbr = local[self.neighbor_idx[cells]]
+        adj = [[w for w in row if w >= 0] for row in nbr.tolist()]
+
+        n = len(cells)
+        disc = [-1] * n
+        low = [0] * n
+        cut = [False] * n
+        counter = 0
+        for root in range(n):
+            if disc[root] != -1:
+                continue
+            disc[root] = low[root] = counter
+            counter += 1
+            root_children = 0
+            stack = [(root, -1, iter(adj[root]))]
+            while stack:
+                v, parent, it = stack[-1]
+                for w in it:
+                    if disc[w] == -1:
+                        disc[w] = low[w] = counter
+                        counter += 1
+                        if v == root:
+                            root_children += 1
+                        stack.append((w, v, iter(adj[w])))
+                        break
+                    elif w != parent and disc[w] < low[v]:
+                        low[v] = disc[w]
+                else:
+                    stack.pop()
+                    if stack:
+                        u = stack[-1][0]
+                        if low[v] < low[u]:
+                            low[u] = low[v]
+                        if u != root and low[v] >= disc[u]:
+                            cut[u] = True
+            if root_children > 1:
+                cut[root] = True
+
+        self.safe_retract = np.zeros(len(self.amoeba), dtype=bool)
+        self.safe_retract[cells[~np.array(cut, dtype=bool)]] = True
+        return self.safe_retract
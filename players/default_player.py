@@ -3,6 +3,7 @@ import pickle
 import numpy as np
 import logging
 from amoeba_state import AmoebaState
+import torus
 
 
 class Player:
@@ -55,21 +56,22 @@ class Player:
         self.current_size = current_percept.current_size
         mini = min(5, len(current_percept.periphery) // 2)
         for i, j in current_percept.bacteria:
-            current_percept.amoeba_map[i][j] = 1
+            current_percept.writable_amoeba_map()[i][j] = 1
 
         retract = [tuple(i) for i in self.rng.choice(current_percept.periphery, replace=False, size=mini)]
+        board = torus.get_torus(current_percept.map_dim)
         movable = self.find_movable_cells(retract, current_percept.periphery, current_percept.amoeba_map,
-                                          current_percept.bacteria, mini)
+                                          current_percept.bacteria, mini, board)
 
         info = 0
 
         return retract, movable, info
 
-    def find_movable_cells(self, retract, periphery, amoeba_map, bacteria, mini):
+    def find_movable_cells(self, retract, periphery, amoeba_map, bacteria, mini, board=torus.default):
         movable = []
         new_periphery = list(set(periphery).difference(set(retract)))
         for i, j in new_periphery:
-            nbr = self.find_movable_neighbor(i, j, amoeba_map, bacteria)
+            nbr = self.find_movable_neighbor(i, j, amoeba_map, bacteria, board)
             for x, y in nbr:
                 if (x, y) not in movable:
                     movable.append((x, y))
@@ -78,16 +80,11 @@ class Player:
 
         return movable[:mini]
 
-    def find_movable_neighbor(self, x, y, amoeba_map, bacteria):
+    def find_movable_neighbor(self, x, y, amoeba_map, bacteria, board=torus.default):
         out = []
         if (x, y) not in bacteria:
-            if amoeba_map[x][(y - 1) % 100] == 0:
-                out.append((x, (y - 1) % 100))
-            if amoeba_map[x][(y + 1) % 100] == 0:
-                out.append((x, (y + 1) % 100))
-            if amoeba_map[(x - 1) % 100][y] == 0:
-                out.append(((x - 1) % 100, y))
-            if amoeba_map[(x + 1) % 100][y] == 0:
-                out.append(((x + 1) % 100, y))
+            for cell in board.neighbors(x, y):
+                if amoeba_map[cell[0]][cell[1]] == 0:
+                    out.append(cell)
 
         return out
@@ -3,6 +3,7 @@ import pickle
 import numpy as np
 import logging
 from amoeba_state import AmoebaState
+import torus
 import math
 
 from queue import PriorityQueue, Queue
@@ -104,17 +105,17 @@ class Player:
         print("Formation at: ", center, next_center)
 
         #cells I can retract
-        retract = self.furthest_to_top_right(list(set(current_percept.periphery).difference(set(formation_needed))), next_center, current_percept)
+        retract = self.furthest_to_top_right(list(current_percept.periphery_set.difference(set(formation_needed))), next_center, current_percept)
 
         #holes behind center
         cavity_cells = self.find_island(current_percept.amoeba_map, (center[0]-1%100, center[1]-1%100))
         shrink_cells = []
 
         for i in cavity_cells:
-            if i in set(current_percept.movable_cells):
+            if i in current_percept.movable_set:
                 shrink_cells.append(i)
 
-        formation_moves = list(set(formation_needed).intersection(set(current_percept.movable_cells)))
+        formation_moves = list(set(formation_needed).intersection(current_percept.movable_set))
         formation_moves.sort(key = lambda x : self.manhattan_distance(x, center), reverse=True)
 
         if len(shrink_cells) > 0:
@@ -179,14 +180,9 @@ class Player:
             a, b = stack.pop()
             check[a][b] = 1
 
-            if (a, (b - 1) % 100) in result and check[a][(b - 1) % 100] == 0:
-                stack.append((a, (b - 1) % 100))
-            if (a, (b + 1) % 100) in result and check[a][(b + 1) % 100] == 0:
-                stack.append((a, (b + 1) % 100))
-            if ((a - 1) % 100, b) in result and check[(a - 1) % 100][b] == 0:
-                stack.append(((a - 1) % 100, b))
-            if ((a + 1) % 100, b) in result and check[(a + 1) % 100][b] == 0:
-                stack.append(((a + 1) % 100, b))
+            for cell in torus.neighbors(a, b):
+                if cell in result and check[cell[0]][cell[1]] == 0:
+                    stack.append(cell)
 
         return (amoeba == check).all()
         
@@ -252,14 +248,9 @@ class Player:
     def find_neighbor(self, curr, amoeba_map):
         x, y = curr
         out = []
-        if amoeba_map[x][(y - 1) % 100] == 0:
-            out.append((x, (y - 1) % 100))
-        if amoeba_map[x][(y + 1) % 100] == 0:
-            out.append((x, (y + 1) % 100))
-        if amoeba_map[(x - 1) % 100][y] == 0:
-            out.append(((x - 1) % 100, y))
-        if amoeba_map[(x + 1) % 100][y] == 0:
-            out.append(((x + 1) % 100, y))
+        for cell in torus.neighbors(x, y):
+            if amoeba_map[cell[0]][cell[1]] == 0:
+                out.append(cell)
 
         return out
 
@@ -295,14 +286,9 @@ class Player:
     def find_movable_neighbor(self, x, y, amoeba_map, bacteria):
         out = []
         if (x, y) not in bacteria:
-            if amoeba_map[x][(y - 1) % 100] == 0:
-                out.append((x, (y - 1) % 100))
-            if amoeba_map[x][(y + 1) % 100] == 0:
-                out.append((x, (y + 1) % 100))
-            if amoeba_map[(x - 1) % 100][y] == 0:
-                out.append(((x - 1) % 100, y))
-            if amoeba_map[(x + 1) % 100][y] == 0:
-                out.append(((x + 1) % 100, y))
+            for cell in torus.neighbors(x, y):
+                if amoeba_map[cell[0]][cell[1]] == 0:
+                    out.append(cell)
 
         return out
 
@@ -371,13 +357,8 @@ class Player:
             a, b = stack.pop()
             check[a][b] = 1
 
-            if (a, (b - 1) % 100) in result and check[a][(b - 1) % 100] == 0:
-                stack.append((a, (b - 1) % 100))
-            if (a, (b + 1) % 100) in result and check[a][(b + 1) % 100] == 0:
-                stack.append((a, (b + 1) % 100))
-            if ((a - 1) % 100, b) in result and check[(a - 1) % 100][b] == 0:
-                stack.append(((a - 1) % 100, b))
-            if ((a + 1) % 100, b) in result and check[(a + 1) % 100][b] == 0:
-                stack.append(((a + 1) % 100, b))
+            for cell in torus.neighbors(a, b):
+                if cell in result and check[cell[0]][cell[1]] == 0:
+                    stack.append(cell)
 
         return (amoeba == check).all()
\ No newline at end of file
@@ -11,6 +11,7 @@ import numpy.typing as npt
 
 import constants
 from amoeba_state import AmoebaState
+import torus
 
 turn = 0
 
@@ -366,14 +367,9 @@ class Player:
     ) -> List[Tuple[int, int]]:
         out = []
         if (x, y) not in bacteria:
-            if amoeba_map[x][(y - 1) % constants.map_dim] == 0:
-                out.append((x, (y - 1) % constants.map_dim))
-            if amoeba_map[x][(y + 1) % constants.map_dim] == 0:
-                out.append((x, (y + 1) % constants.map_dim))
-            if amoeba_map[(x - 1) % constants.map_dim][y] == 0:
-                out.append(((x - 1) % constants.map_dim, y))
-            if amoeba_map[(x + 1) % constants.map_dim][y] == 0:
-                out.append(((x + 1) % constants.map_dim, y))
+            for cell in torus.neighbors(x, y):
+                if amoeba_map[cell[0]][cell[1]] == 0:
+                    out.append(cell)
         return out
 
     # Adapted from amoeba_game code
@@ -414,22 +410,9 @@ class Player:
             a, b = stack.pop()
             check[a][b] = 1
 
-            if (a, (b - 1) % constants.map_dim) in result and check[a][
-                (b - 1) % constants.map_dim
-            ] == 0:
-                stack.append((a, (b - 1) % constants.map_dim))
-            if (a, (b + 1) % constants.map_dim) in result and check[a][
-                (b + 1) % constants.map_dim
-            ] == 0:
-                stack.append((a, (b + 1) % constants.map_dim))
-            if ((a - 1) % constants.map_dim, b) in result and check[
-                (a - 1) % constants.map_dim
-            ][b] == 0:
-                stack.append(((a - 1) % constants.map_dim, b))
-            if ((a + 1) % constants.map_dim, b) in result and check[
-                (a + 1) % constants.map_dim
-            ][b] == 0:
-                stack.append(((a + 1) % constants.map_dim, b))
+            for cell in torus.neighbors(a, b):
+                if cell in result and check[cell[0]][cell[1]] == 0:
+                    stack.append(cell)
 
         return (amoeba == check).all()
 
@@ -437,7 +420,7 @@ class Player:
         self.current_size = current_percept.current_size
         self.amoeba_map = current_percept.amoeba_map
         self.retractable_cells = current_percept.periphery
-        self.bacteria_cells = set(current_percept.bacteria)
+        self.bacteria_cells = current_percept.bacteria_set
         self.extendable_cells = current_percept.movable_cells
         self.num_available_moves = int(
             np.ceil(self.metabolism * current_percept.current_size)
@@ -3,11 +3,11 @@ import pickle
 import numpy as np
 import logging
 from amoeba_state import AmoebaState
+import torus
 import constants
 
 import random
 from typing import Tuple, List
-import numpy.typing as npt
 import math
 
 MAP_LENGTH = 100
@@ -51,6 +51,7 @@ class Player:
         self.periphery = None
         self.bacteria = None
         self.movable_cells = None
+        self.amoeba_points = None
         self.num_available_moves = 0
         self.static_center = [50, 50]
 
@@ -93,22 +94,9 @@ class Player:
             a, b = stack.pop()
             check[a][b] = 1
 
-            if (a, (b - 1) % constants.map_dim) in result and check[a][
-                (b - 1) % constants.map_dim
-            ] == 0:
-                stack.append((a, (b - 1) % constants.map_dim))
-            if (a, (b + 1) % constants.map_dim) in result and check[a][
-                (b + 1) % constants.map_dim
-            ] == 0:
-                stack.append((a, (b + 1) % constants.map_dim))
-            if ((a - 1) % constants.map_dim, b) in result and check[
-                (a - 1) % constants.map_dim
-            ][b] == 0:
-                stack.append(((a - 1) % constants.map_dim, b))
-            if ((a + 1) % constants.map_dim, b) in result and check[
-                (a + 1) % constants.map_dim
-            ][b] == 0:
-                stack.append(((a + 1) % constants.map_dim, b))
+            for cell in torus.neighbors(a, b):
+                if cell in result and check[cell[0]][cell[1]] == 0:
+                    stack.append(cell)
 
         return (amoeba == check).all()
 
@@ -130,14 +118,9 @@ class Player:
         # cell that is not occupied by the amoeba
         out = []
         if (x, y) not in bacteria:
-            if amoeba_map[x][(y - 1) % 100] == 0:
-                out.append((x, (y - 1) % 100))
-            if amoeba_map[x][(y + 1) % 100] == 0:
-                out.append((x, (y + 1) % 100))
-            if amoeba_map[(x - 1) % 100][y] == 0:
-                out.append(((x - 1) % 100, y))
-            if amoeba_map[(x + 1) % 100][y] == 0:
-                out.append(((x + 1) % 100, y))
+            for cell in torus.neighbors(x, y):
+                if amoeba_map[cell[0]][cell[1]] == 0:
+                    out.append(cell)
 
         return out
     
@@ -503,10 +486,6 @@ class Player:
 
         return offsets
     
-    def map_to_coords(self, amoeba_map: npt.NDArray) -> set[Tuple[int, int]]:
-        # borrowed from group 2
-        return set(list(map(tuple, np.transpose(amoeba_map.nonzero()).tolist())))
-
     def offset_to_absolute(self, offsets:set[Tuple[int]], center_point:Tuple[int]) -> set[Tuple[int]]:
         absolute_cords = set()
         for offset in offsets:
@@ -516,7 +495,7 @@ class Player:
 
     def morph(self, offsets:set, center_point:Tuple[int]):
         # adapted from group 2
-        cur_ameoba_points = self.map_to_coords(self.amoeba_map)
+        cur_ameoba_points = self.amoeba_points
         desired_ameoba_points = self.offset_to_absolute(offsets, center_point)
 
         potential_retracts = list(self.periphery.intersection((cur_ameoba_points.difference(desired_ameoba_points))))
@@ -568,9 +547,10 @@ class Player:
 
         self.current_size = current_percept.current_size
         self.amoeba_map = current_percept.amoeba_map
-        self.periphery = set(current_percept.periphery)
+        self.amoeba_points = current_percept.amoeba_set
+        self.periphery = current_percept.periphery_set
         self.bacteria = current_percept.bacteria
-        self.movable_cells = set(current_percept.movable_cells)
+        self.movable_cells = current_percept.movable_set
         self.num_available_moves = int(np.ceil(self.metabolism * self.current_size))
         goal_percentage = self.current_size/self.goal_size
         bacteria_eaten = self.current_size-self.goal_size/4
@@ -670,7 +650,7 @@ class Player:
     
 
     def in_formation(self, desired_shape_offsets, cur_center, err=0.0) -> bool:
-        cur_ameoba_points = self.map_to_coords(self.amoeba_map)
+        cur_ameoba_points = self.amoeba_points
         desired_ameoba_points = self.offset_to_absolute(desired_shape_offsets, cur_center)
 
         num_potential_retracts = len(self.periphery.intersection((cur_ameoba_points.difference(desired_ameoba_points))))
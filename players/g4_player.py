@@ -13,6 +13,7 @@ import numpy as np
 
 sys.path.append(os.getcwd())
 from amoeba_state import AmoebaState
+import torus
 import constants
 
 
@@ -134,13 +135,7 @@ def find_movable_neighbor(
         return []
 
     out = []
-    for x2, y2 in [
-        # index of 4 neighboring cells
-        (x, (y-1) % 100),
-        (x, (y+1) % 100),
-        ((x-1) % 100, y),
-        ((x+1) % 100, y)
-    ]:
+    for x2, y2 in torus.neighbors(x, y):
         if amoeba_map[x2][y2] == State.empty.value:
             out.append((x2, y2))
 
@@ -274,14 +269,9 @@ def check_move(
         a, b = stack.pop()
         check[a][b] = 1
 
-        if (a, (b - 1) % constants.map_dim) in result and check[a][(b - 1) % constants.map_dim] == 0:
-            stack.append((a, (b - 1) % constants.map_dim))
-        if (a, (b + 1) % constants.map_dim) in result and check[a][(b + 1) % constants.map_dim] == 0:
-            stack.append((a, (b + 1) % constants.map_dim))
-        if ((a - 1) % constants.map_dim, b) in result and check[(a - 1) % constants.map_dim][b] == 0:
-            stack.append(((a - 1) % constants.map_dim, b))
-        if ((a + 1) % constants.map_dim, b) in result and check[(a + 1) % constants.map_dim][b] == 0:
-            stack.append(((a + 1) % constants.map_dim, b))
+        for neighbor in torus.neighbors(a, b):
+            if neighbor in result and check[neighbor[0]][neighbor[1]] == 0:
+                stack.append(neighbor)
 
     return (amoeba == check).all()
 
@@ -985,7 +975,7 @@ class Player:
         # known bacteria to the ameoba will be eaten before our next move
         # update ameoba_map and current_size to reflect this
         for i, j in current_percept.bacteria:
-            current_percept.amoeba_map[i][j] = State.bacteria.value
+            current_percept.writable_amoeba_map()[i][j] = State.bacteria.value
             current_percept.current_size += 1
         self.current_size = current_percept.current_size
 
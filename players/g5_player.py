@@ -7,6 +7,7 @@ import numpy.typing as npt
 from typing import Tuple, List
 import logging
 from amoeba_state import AmoebaState
+import torus
 import math
 import time
 import matplotlib.pyplot as plt
@@ -402,7 +403,8 @@ class Player:
 
     def get_valid_neighbors(self, cell):
         x, y = cell
-        neighbors = [((x - 1) % 100, y), ((x + 1) % 100, y), (x, (y - 1) % 100), (x, (y + 1) % 100)]
+        up, down, left, right = torus.neighbors(x, y)
+        neighbors = [left, right, up, down]
         valid_neighbors = []
         for neighbor in neighbors:
             if self.amoeba_map[neighbor] == 1:
@@ -411,8 +413,8 @@ class Player:
 
     def get_neighbors(self, cell):
         x, y = cell
-        neighbors = [((x - 1) % 100, y), ((x + 1) % 100, y), (x, (y - 1) % 100), (x, (y + 1) % 100)]
-        return neighbors
+        up, down, left, right = torus.neighbors(x, y)
+        return [left, right, up, down]
 
     # copied from G2
     def get_morph_moves(self, desired_amoeba: npt.NDArray) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
@@ -541,14 +543,9 @@ class Player:
             a, b = stack.pop()
             check[a][b] = 1
 
-            if (a, (b - 1) % MAP_DIM) in result and check[a][(b - 1) % MAP_DIM] == 0:
-                stack.append((a, (b - 1) % MAP_DIM))
-            if (a, (b + 1) % MAP_DIM) in result and check[a][(b + 1) % MAP_DIM] == 0:
-                stack.append((a, (b + 1) % MAP_DIM))
-            if ((a - 1) % MAP_DIM, b) in result and check[(a - 1) % MAP_DIM][b] == 0:
-                stack.append(((a - 1) % MAP_DIM, b))
-            if ((a + 1) % MAP_DIM, b) in result and check[(a + 1) % MAP_DIM][b] == 0:
-                stack.append(((a + 1) % MAP_DIM, b))
+            for cell in torus.neighbors(a, b):
+                if cell in result and check[cell[0]][cell[1]] == 0:
+                    stack.append(cell)
 
         return (amoeba == check).all()
 
@@ -701,14 +698,9 @@ class Player:
 
     def find_movable_neighbor(self, x, y):
         out = []
-        if self.map_state[x][(y - 1) % MAP_DIM] < 1:
-            out.append((x, (y - 1) % MAP_DIM))
-        if self.map_state[x][(y + 1) % MAP_DIM] < 1:
-            out.append((x, (y + 1) % MAP_DIM))
-        if self.map_state[(x - 1) % MAP_DIM][y] < 1:
-            out.append(((x - 1) % MAP_DIM, y))
-        if self.map_state[(x + 1) % MAP_DIM][y] < 1:
-            out.append(((x + 1) % MAP_DIM, y))
+        for cell in torus.neighbors(x, y):
+            if self.map_state[cell[0]][cell[1]] < 1:
+                out.append(cell)
 
         return out
 
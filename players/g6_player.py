@@ -3,6 +3,7 @@ import pickle
 import numpy as np
 import logging
 from amoeba_state import AmoebaState
+import torus
 from matplotlib import pyplot as plt
 
 EXTEND_COLOR = (np.random.rand(1,1,3) * 255).astype(int)
@@ -511,14 +512,9 @@ class Player:
     def find_movable_neighbor(self, x, y, amoeba_map, bacteria):
         out = []
         if (x, y) not in bacteria:
-            if amoeba_map[x][(y - 1) % 100] == 0:
-                out.append((x, (y - 1) % 100))
-            if amoeba_map[x][(y + 1) % 100] == 0:
-                out.append((x, (y + 1) % 100))
-            if amoeba_map[(x - 1) % 100][y] == 0:
-                out.append(((x - 1) % 100, y))
-            if amoeba_map[(x + 1) % 100][y] == 0:
-                out.append(((x + 1) % 100, y))
+            for cell in torus.neighbors(x, y):
+                if amoeba_map[cell[0]][cell[1]] == 0:
+                    out.append(cell)
 
         return out
 
@@ -4,6 +4,7 @@ import numpy as np
 import logging
 from matplotlib import pyplot as plt
 from copy import deepcopy
+import torus
 
 # ---------------------------------------------------------------------------- #
 #                               Helper Functions                               #
@@ -28,10 +29,11 @@ def wrap_point(x, y):
     '''
     Wrap the point around the grid
     '''
-    return (x % 100, y % 100)
+    return torus.wrap(x, y)
 
 def get_neighbors(x, y, amoeba_map):
-    neighbors = [wrap_point(x - 1, y), wrap_point(x + 1, y), wrap_point(x, y + 1), wrap_point(x, y - 1)]
+    up, down, left, right = torus.neighbors(x, y)
+    neighbors = [left, right, down, up]
     return [n for n in neighbors if amoeba_map[n[0]][n[1]] == 1]
 
 def breaks_amoeba(point, amoeba_map):
@@ -205,7 +207,7 @@ class RakeFormation(Formation):
             self.allPoints.extend([(x, 50+y) for x in range(100)])
 
     def get_phase(self, phase, state, retract, movable):
-        nCells = sum([sum(row) for row in state.amoeba_map])
+        nCells = int(np.sum(state.amoeba_map))
         xStart, xEnd, yStart, yEnd = self._get_current_xy(state.amoeba_map)
         emptyCols = self._get_empty_cols_between(xStart, xEnd, state.amoeba_map)
         if phase == 0:
@@ -221,7 +223,7 @@ class RakeFormation(Formation):
         return phase
 
     def get_next_formation_points(self, state):
-        nCells = sum([sum(row) for row in state.amoeba_map])
+        nCells = int(np.sum(state.amoeba_map))
         amoebaMap = state.amoeba_map
         amoebaPoints = [(i, j) for i, row in enumerate(amoebaMap) for j, cell in enumerate(row) if cell == 1]
 
@@ -405,7 +407,7 @@ class RakeFormation(Formation):
         :param amoebaMap: The amoeba map
         :return: list of indices of empty cols
         '''
-        nCells = sum([sum(row) for row in amoebaMap])
+        nCells = int(np.sum(amoebaMap))
         expectedLen = min(100, (3 * min(nCells // 7, 33)) % 100)
         emptyCols = []
 
@@ -557,7 +559,7 @@ class Player:
         nAdjacentBacteria = 0
         for i, j in current_percept.bacteria:
             nAdjacentBacteria += 1
-            current_percept.amoeba_map[i][j] = 1
+            current_percept.writable_amoeba_map()[i][j] = 1
 
         phase, count, isMoving, info = self.decode_info(info)
         # update byte of info
@@ -578,7 +580,7 @@ class Player:
 
         self.formation.update(phase)
         goalFormation = self.formation.get_next_formation_points(current_percept)
-        nCells = sum([sum(row) for row in current_percept.amoeba_map])
+        nCells = int(np.sum(current_percept.amoeba_map))
         firstCells = remove_duplicates(goalFormation)[:nCells]
         # plot_points_helper(firstCells)
         allRetractable = self.formation.get_all_retractable_points(firstCells, current_percept)
@@ -624,14 +626,9 @@ class Player:
     def find_movable_neighbor(self, x, y, amoeba_map, bacteria):
         out = []
         if (x, y) not in bacteria:
-            if amoeba_map[x][(y - 1) % 100] == 0:
-                out.append((x, (y - 1) % 100))
-            if amoeba_map[x][(y + 1) % 100] == 0:
-                out.append((x, (y + 1) % 100))
-            if amoeba_map[(x - 1) % 100][y] == 0:
-                out.append(((x - 1) % 100, y))
-            if amoeba_map[(x + 1) % 100][y] == 0:
-                out.append(((x + 1) % 100, y))
+            for cell in torus.neighbors(x, y):
+                if amoeba_map[cell[0]][cell[1]] == 0:
+                    out.append(cell)
 
         return out
 
@@ -3,6 +3,7 @@ import pickle
 import numpy as np
 import logging
 from amoeba_state import AmoebaState
+import torus
 from typing import Tuple, List, Dict
 import numpy.typing as npt
 import constants
@@ -338,14 +339,9 @@ class Player:
     ) -> List[Tuple[int, int]]:
         out = []
         if (x, y) not in bacteria:
-            if amoeba_map[x][(y - 1) % constants.map_dim] == 0:
-                out.append((x, (y - 1) % constants.map_dim))
-            if amoeba_map[x][(y + 1) % constants.map_dim] == 0:
-                out.append((x, (y + 1) % constants.map_dim))
-            if amoeba_map[(x - 1) % constants.map_dim][y] == 0:
-                out.append(((x - 1) % constants.map_dim, y))
-            if amoeba_map[(x + 1) % constants.map_dim][y] == 0:
-                out.append(((x + 1) % constants.map_dim, y))
+            for cell in torus.neighbors(x, y):
+                if amoeba_map[cell[0]][cell[1]] == 0:
+                    out.append(cell)
         return out
 
     # Adapted from amoeba_game code
@@ -385,22 +381,9 @@ class Player:
             a, b = stack.pop()
             check[a][b] = 1
 
-            if (a, (b - 1) % constants.map_dim) in result and check[a][
-                (b - 1) % constants.map_dim
-            ] == 0:
-                stack.append((a, (b - 1) % constants.map_dim))
-            if (a, (b + 1) % constants.map_dim) in result and check[a][
-                (b + 1) % constants.map_dim
-            ] == 0:
-                stack.append((a, (b + 1) % constants.map_dim))
-            if ((a - 1) % constants.map_dim, b) in result and check[
-                (a - 1) % constants.map_dim
-            ][b] == 0:
-                stack.append(((a - 1) % constants.map_dim, b))
-            if ((a + 1) % constants.map_dim, b) in result and check[
-                (a + 1) % constants.map_dim
-            ][b] == 0:
-                stack.append(((a + 1) % constants.map_dim, b))
+            for cell in torus.neighbors(a, b):
+                if cell in result and check[cell[0]][cell[1]] == 0:
+                    stack.append(cell)
 
         return (amoeba == check).all()
 
@@ -0,0 +1,143 @@
+import functools
+import numpy as np
+
+LEGACY = "legacy"
+STREAMS = "streams"
+
+# random bits the bacteria motion stream draws at a time in streams mode
+BLOCK_BITS = 1 << 16
+
+
+@functools.lru_cache(maxsize=None)
+def find_two_way_choice_shift():
+    """Finds which bit of a 32 bit draw decides rng.choice between two items on the installed NumPy version
+
+        Raises:
+            RuntimeError: if no known bit matches, as legacy compat games would then no longer replay the games of
+                earlier versions
+    """
+    probe = np.random.default_rng(0)
+    picks = np.array([probe.choice([0, 1], replace=False) for _ in range(64)])
+    draws = np.random.default_rng(0).integers(0, 2 ** 32, size=64, dtype=np.uint32)
+    for shift in (31, 0):
+        if (picks == draws >> shift & 1).all():
+            return shift
+    raise RuntimeError("Generator.choice of NumPy {} draws differently from the versions legacy mode replays, use "
+                       "rng_mode streams".format(np.__version__))
+
+
+def copy_generator(rng):
+    other = np.random.Generator(type(rng.bit_generator)())
+    other.bit_generator.state = rng.bit_generator.state
+    return other
+
+
+class RandomStreams:
+    def __init__(self, seed=None, mode=LEGACY):
+        """The random number generators of one game: one for the player, one moving the bacteria and one spawning them
+
+            In legacy mode the three are a single generator seeded with seed, drawn from in the order earlier
+            versions did, so that seeded games play out as they always have, the draws of the player interleaving
+            with those of the bacteria. In streams mode they are independent generators spawned from the
+            SeedSequence of seed, so what the player draws never changes how the bacteria move or spawn, and the
+            bacteria motion draws its random bits BLOCK_BITS at a time instead of a few each turn. Games stay
+            reproducible for a given seed and mode.
+
+            Args:
+                seed (int): seed of the game, None for fresh entropy
+                mode (str): "legacy" or "streams"
+        """
+        if mode not in (LEGACY, STREAMS):
+            raise ValueError("Unknown random stream mode {}".format(mode))
+        self.player = np.random.default_rng()
+        self.reseed(seed, mode)
+
+    @classmethod
+    def shared(cls, rng):
+        """Returns legacy streams drawing from the given generator"""
+        streams = cls.__new__(cls)
+        streams.player = rng
+        streams.set_mode(LEGACY)
+        return streams
+
+    def set_mode(self, mode):
+        self.mode = mode
+        if mode == LEGACY:
+            self.motion = self.spawn = self.player
+        else:
+            self.motion = np.random.default_rng()
+            self.spawn = np.random.default_rng()
+        # pre-drawn random bits of the motion stream, used from bit_pos on
+        self.bits = np.zeros(0, dtype=np.uint8)
+        self.bit_pos = 0
+
+    def reseed(self, seed=None, mode=None):
+        """Restarts the streams from seed in the given mode, the current one by default, keeping the player's
+            generator object, which the player may hold on to
+        """
+        self.set_mode(mode or self.mode)
+        if self.mode == LEGACY:
+            self.player.bit_generator.state = np.random.default_rng(seed).bit_generator.state
+            return
+        for rng, child in zip((self.player, self.motion, self.spawn), np.random.SeedSequence(seed).spawn(3)):
+            rng.bit_generator.state = np.random.default_rng(child).bit_generator.state
+
+    def copy(self):
+        """Returns streams in the same state that draw independently from these"""
+        other = RandomStreams.__new__(RandomStreams)
+        other.player = copy_generator(self.player)
+        other.set_mode(self.mode)
+        if self.mode == STREAMS:
+            other.motion = copy_generator(self.motion)
+            other.spawn = copy_generator(self.spawn)
+            other.bits = self.bits
+            other.bit_pos = self.bit_pos
+        return other
+
+    def get_state(self):
+        """Returns everything that decides the draws to come, as a dict that json can write"""
+        if self.mode == LEGACY:
+            return {"mode": LEGACY, "player": self.player.bit_generator.state}
+        return {"mode": STREAMS, "player": self.player.bit_generator.state,
+                "motion": self.motion.bit_generator.state, "spawn": self.spawn.bit_generator.state,
+                "bits": np.packbits(self.bits[self.bit_pos:]).tobytes().hex(),
+                "bit_count": len(self.bits) - self.bit_pos}
+
+    def set_state(self, state):
+        """Restores a state returned by get_state, keeping the player's generator object"""
+        self.set_mode(state["mode"])
+        self.player.bit_generator.state = state["player"]
+        if self.mode == STREAMS:
+            self.motion.bit_generator.state = state["motion"]
+            self.spawn.bit_generator.state = state["spawn"]
+            bits = np.frombuffer(bytes.fromhex(state["bits"]), dtype=np.uint8)
+            self.bits = np.unpackbits(bits)[:state["bit_count"]]
+
+    def take_bits(self, k):
+        """Returns the next k pre-drawn random bits of the motion stream, drawing a new block when they run out"""
+        if self.bit_pos + k > len(self.bits):
+            drawn = np.unpackbits(np.frombuffer(self.motion.bytes(max(BLOCK_BITS, k) // 8 + 1), dtype=np.uint8))
+            self.bits = np.concatenate([self.bits[self.bit_pos:], drawn])
+            self.bit_pos = 0
+        bits = self.bits[self.bit_pos:self.bit_pos + k]
+        self.bit_pos += k
+        return bits
+
+    def move_bits(self, k):
+        """Returns one random bit for each of k bacteria moving at once, as in fast mode"""
+        if self.mode == LEGACY:
+            return self.motion.integers(0, 2, size=k)
+        return self.take_bits(k)
+
+    def two_way_choices(self, k):
+        """Returns the random bits of k bacteria moving in turn that each pick one of two free cells, as in compat
+            mode
+        """
+        if self.mode == LEGACY:
+            # rng.choice over two items consumes one 32 bit draw per call, so k calls can be drawn in one block
+            return self.motion.integers(0, 2 ** 32, size=k, dtype=np.uint32) >> find_two_way_choice_shift() & 1
+        return self.take_bits(k)
+
+    def choice(self, n, k):
+        """Draws k distinct integers below n for spawning bacteria, as rng.choice(n, replace=False, size=k)"""
+        return self.spawn.choice(n, replace=False, size=k)
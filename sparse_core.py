@@ -0,0 +1,158 @@
+import numpy as np
+import constants
+from amoeba_state import AmoebaState
+from bacteria_store import BacteriaStore
+from chunked_array import ChunkedArray
+from game_core import GameCore, scan_periphery
+from move_validator import MoveValidator
+from sparse_map import SparseMap
+
+
+class SparseFreeCells:
+    """Stands in for the free cell pool of GameCore: the sparse backend finds the free cells from the cells that
+        are taken when bacteria spawn, so there is nothing to keep up to date
+    """
+
+    def reset(self):
+        pass
+
+    def load(self, flat):
+        pass
+
+    def copy(self, board):
+        return self
+
+    def sync(self, flat):
+        pass
+
+    def positions(self):
+        return np.zeros(0, dtype=int)
+
+
+class SparseGameCore(GameCore):
+    backend = "sparse"
+
+    def __init__(self, rng, metabolism, size, density, bacteria_mode="compat", map_dim=constants.map_dim):
+        """GameCore keeping the board, the amoeba map and the bacteria index in ChunkedArrays, for large boards that
+            are mostly empty
+
+            Every step of a turn takes time proportional to the number of cells of the amoeba, its surroundings and
+            the bacteria instead of the size of the board, and percepts hold a SparseMap as amoeba_map. A compat
+            game plays out exactly as it does on GameCore with the same seed. Fast games move the bacteria the same
+            way but spawn them as compat games do, as there is no pool of free cells to sample from, so they differ
+            from fast games on GameCore.
+
+            Args:
+                rng (RandomStreams or np.random.Generator): streams driving the bacteria, whose player generator
+                    is shared with the player, or a generator to use as legacy streams
+                metabolism (float): proportion of the amoeba that may be retracted in one turn
+                size (int): side of the initial amoeba square
+                density (float): proportion of the free cells holding bacteria
+                bacteria_mode (str): "compat" or "fast", see GameCore.bacteria_move
+                map_dim (int): side of the board
+        """
+        super().__init__(rng, metabolism, size, density, bacteria_mode, map_dim)
+
+    def allocate_storage(self, map_state=None):
+        self.bacteria = BacteriaStore(self.total_cells, self.map_dim, sparse=True)
+        # -1 bacterium, 0 empty, 1 amoeba interior, 2 amoeba periphery
+        self.board = ChunkedArray(self.total_cells, dtype=np.int8)
+        self.free_cells = SparseFreeCells()
+
+    def copy_storage(self, other):
+        other.board = self.board.copy()
+        other.free_cells = self.free_cells
+
+    @property
+    def map_state(self):
+        """Dense copy of the board, for rendering"""
+        return np.asarray(self.board).reshape(self.map_dim, self.map_dim)
+
+    def neighbors_of(self, flat):
+        return self.torus.neighbor_flat(flat)
+
+    def new_cell_array(self, fill):
+        return ChunkedArray(self.total_cells, fill)
+
+    def amoeba_map_from_board(self):
+        cells, values = self.board_cells()
+        amoeba_map = ChunkedArray(self.total_cells, dtype=np.int8)
+        amoeba_map[cells[values > 0]] = 1
+        return amoeba_map
+
+    def board_cells(self):
+        cells = self.board.indices()
+        return cells, self.board[cells]
+
+    def update_amoeba_map(self, cells, value):
+        if not len(cells):
+            return
+        if self.amoeba_map_shared:
+            self.amoeba_map = self.amoeba_map.copy()
+            self.amoeba_map_shared = False
+        self.amoeba_map[cells] = value
+
+    def get_periphery_info(self, edit, found=None, removed=None):
+        """Builds the same percept as GameCore.get_periphery_info from the neighbours of the periphery cells"""
+        periphery, periphery_set = self.get_periphery_frame()
+        board = self.board
+
+        scanned, enclosed = scan_periphery(board, self.neighbors_of(periphery), found is None, edit)
+        eatable_bacteria, movable_cells = found if scanned is None else scanned
+
+        removed = np.zeros(0, dtype=int)
+        if edit:
+            removed = periphery[enclosed]
+            board[removed] = 1
+            self.periphery.difference_update(removed.tolist())
+
+        # players have always received the periphery in the iteration order of a set of (x, y) tuples
+        periphery_cells = list(periphery_set.difference(set(self.torus.to_cells(removed))))
+        if len(removed):
+            periphery = periphery[~enclosed]
+            self.periphery_frame = None
+
+        amoeba = SparseMap(self.amoeba_map, self.map_dim, writeable=False)
+        self.amoeba_map_shared = True
+
+        for flat in (periphery, eatable_bacteria, movable_cells):
+            flat.flags.writeable = False
+
+        return AmoebaState(self.amoeba_size, amoeba, periphery_cells, self.torus.to_cells(eatable_bacteria),
+                           self.torus.to_cells(movable_cells), periphery_idx=periphery,
+                           bacteria_idx=eatable_bacteria, movable_idx=movable_cells, map_dim=self.map_dim)
+
+    def check_move(self, retract, move, periphery):
+        """Checks a move as GameCore.check_move does, on the amoeba and the cells next to its periphery only
+
+            Those cells are numbered in increasing order, and any cell outside them can neither be retracted nor
+            moved into, so it is given to the validator as a cell off the board.
+        """
+        amoeba_cells = self.amoeba_map.indices()
+        cells = np.union1d(amoeba_cells, self.neighbors_of(periphery).ravel())
+        outside = len(cells)
+
+        def local(flat):
+            pos = np.minimum(np.searchsorted(cells, flat), outside - 1)
+            return np.where(cells[pos] == flat, pos, -1)
+
+        amoeba = np.zeros(outside + 1, dtype=bool)
+        amoeba[local(amoeba_cells)] = True
+        neighbor_idx = local(self.neighbors_of(cells))
+        neighbor_idx[neighbor_idx < 0] = outside
+        neighbor_idx = np.concatenate([neighbor_idx, np.full((1, 4), outside)])
+        validator = MoveValidator(amoeba, local(periphery), neighbor_idx)
+        return validator.check(local(retract), local(move))
+
+    def spawn_bacteria(self, k, free=None):
+        if k <= 0:
+            return
+        # the same draw as picking from the list of free cells in row-major order: the free cell of rank r is r plus
+        # the number of taken cells that have at most r free cells before them
+        taken = self.board.indices()
+        free_before = taken - np.arange(len(taken))
+        rank = self.streams.choice(self.total_cells - len(taken), k)
+        new_bacteria = rank + np.searchsorted(free_before, rank, side="right")
+
+        self.bacteria.add(new_bacteria)
+        self.board[new_bacteria] = -1
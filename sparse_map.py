@@ -0,0 +1,138 @@
+import numpy as np
+from types import SimpleNamespace
+from numpy.lib.mixins import NDArrayOperatorsMixin
+
+INTEGERS = (int, np.integer)
+
+
+def is_cell(key):
+    return type(key) is tuple and len(key) == 2 and isinstance(key[0], INTEGERS) and isinstance(key[1], INTEGERS)
+
+
+def to_dense(value):
+    return np.asarray(value) if isinstance(value, (SparseMap, SparseRow)) else value
+
+
+def apply_ufunc(ufunc, method, inputs, kwargs):
+    # operators and numpy functions run on dense copies, results are plain arrays
+    if any(isinstance(out, (SparseMap, SparseRow)) for out in kwargs.get("out", ())):
+        return NotImplemented
+    return getattr(ufunc, method)(*(to_dense(value) for value in inputs), **kwargs)
+
+
+class SparseMap(NDArrayOperatorsMixin):
+    def __init__(self, cells, map_dim, writeable=True):
+        """map_dim x map_dim board kept in a ChunkedArray, handed out as amoeba_map by the sparse backend
+
+            Reading or writing a single cell with board[x][y] or board[x, y], and nonzero(), take time that does
+            not depend on the size of the board. Everything else numpy arrays offer, such as slices, operators,
+            numpy functions and array methods, works on a dense copy of the board, so players that need
+            whole-board operations should call np.asarray once and work on the result.
+
+            Args:
+                cells (ChunkedArray): the board, flattened as x * map_dim + y
+                map_dim (int): side of the board
+                writeable (bool): whether the board may be written to, read back in flags.writeable as for numpy
+                    arrays
+        """
+        self.cells = cells
+        self.map_dim = map_dim
+        self.shape = (map_dim, map_dim)
+        self.ndim = 2
+        self.size = map_dim * map_dim
+        self.dtype = cells.dtype
+        self.flags = SimpleNamespace(writeable=writeable)
+
+    def flat_index(self, x, y):
+        if not (-self.map_dim <= x < self.map_dim and -self.map_dim <= y < self.map_dim):
+            raise IndexError("index ({}, {}) is out of bounds for a board of side {}".format(x, y, self.map_dim))
+        return x % self.map_dim * self.map_dim + y % self.map_dim
+
+    def __len__(self):
+        return self.map_dim
+
+    def __iter__(self):
+        return (SparseRow(self, x) for x in range(self.map_dim))
+
+    def __contains__(self, value):
+        return value in np.asarray(self)
+
+    def __getitem__(self, key):
+        if is_cell(key):
+            return self.cells[self.flat_index(*key)]
+        if isinstance(key, INTEGERS):
+            self.flat_index(key, 0)
+            return SparseRow(self, key % self.map_dim)
+        return np.asarray(self)[key]
+
+    def __setitem__(self, key, value):
+        if not self.flags.writeable:
+            raise ValueError("assignment destination is read-only")
+        if is_cell(key):
+            self.cells[self.flat_index(*key)] = value
+        else:
+            index = np.arange(self.size).reshape(self.shape)[key]
+            self.cells[index.ravel()] = np.broadcast_to(value, index.shape).ravel()
+
+    def __array__(self, dtype=None, copy=None):
+        return np.asarray(self.cells, dtype=dtype).reshape(self.shape)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        return apply_ufunc(ufunc, method, inputs, kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith("_") or "cells" not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(np.asarray(self), name)
+
+    def __repr__(self):
+        return "SparseMap({}, map_dim={})".format(len(self.cells.indices()), self.map_dim)
+
+    def copy(self):
+        return SparseMap(self.cells.copy(), self.map_dim)
+
+    # copies are writeable, as copies of read-only numpy arrays are
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def nonzero(self):
+        return np.divmod(self.cells.indices(), self.map_dim)
+
+
+class SparseRow(NDArrayOperatorsMixin):
+    def __init__(self, board, x):
+        """Row x of a SparseMap, reading and writing through to the board"""
+        self.board = board
+        self.x = x
+
+    def __len__(self):
+        return self.board.map_dim
+
+    def __iter__(self):
+        return iter(np.asarray(self))
+
+    def __contains__(self, value):
+        return value in np.asarray(self)
+
+    def __getitem__(self, y):
+        if isinstance(y, INTEGERS):
+            return self.board.cells[self.board.flat_index(self.x, y)]
+        return np.asarray(self)[y]
+
+    def __setitem__(self, y, value):
+        self.board[self.x, y] = value
+
+    def __array__(self, dtype=None, copy=None):
+        row = self.board.cells[self.x * self.board.map_dim + np.arange(self.board.map_dim)]
+        return row if dtype is None else row.astype(dtype)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        return apply_ufunc(ufunc, method, inputs, kwargs)
+
+    def __getattr__(self, name):
+        if name.startswith("_") or "board" not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(np.asarray(self), name)
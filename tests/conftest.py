@@ -0,0 +1,16 @@
+import os
+import sys
+import pytest
+
+# the modules of the simulator live at the top of the repository and import each other by name, and the tests
+# import the trace helpers next to them
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def in_tmp_path(tmp_path, monkeypatch):
+    """Runs every test in its own directory, as AmoebaEnv and some players write files such as precomp/ and tmp.png
+        into the working directory
+    """
+    monkeypatch.chdir(tmp_path)
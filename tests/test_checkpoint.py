@@ -0,0 +1,29 @@
+import logging
+import numpy as np
+import pytest
+from checkpoint import load_checkpoint, save_checkpoint
+from game_core import GameCore
+from sparse_core import SparseGameCore
+from players.default_player import Player as DefaultPlayer
+
+DELTA_FIELDS = ("amoeba_added_idx", "amoeba_removed_idx", "bacteria_eaten_idx", "periphery_added_idx",
+                "periphery_removed_idx", "movable_added_idx", "movable_removed_idx")
+
+
+@pytest.mark.parametrize("core_class", [GameCore, SparseGameCore])
+def test_the_first_percept_after_a_resume_has_the_delta_of_an_uninterrupted_game(core_class, tmp_path):
+    core = core_class(np.random.default_rng(5), 1.0, 9, 0.3)
+    player = DefaultPlayer(rng=core.rng, logger=logging.getLogger(__name__), metabolism=1.0,
+                           goal_size=core.goal_size, precomp_dir=str(tmp_path))
+    for _ in range(8):
+        core.step(player.move(core.after_last_move, core.observe(), core.player_byte))
+    save_checkpoint(core, "game.npz")
+
+    resumed = core_class(np.random.default_rng(0), 1.0, 9, 0.3)
+    load_checkpoint(resumed, "game.npz")
+    delta, resumed_delta = core.observe().delta, resumed.observe().delta
+
+    assert resumed_delta is not None
+    assert len(delta.amoeba_added_idx) or len(delta.amoeba_removed_idx)
+    for name in DELTA_FIELDS:
+        assert np.array_equal(getattr(resumed_delta, name), getattr(delta, name)), name
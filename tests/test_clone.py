@@ -0,0 +1,32 @@
+import logging
+import numpy as np
+import pytest
+from game_core import GameCore
+from sparse_core import SparseGameCore
+from players.default_player import Player as DefaultPlayer
+
+
+@pytest.mark.parametrize("core_class", [GameCore, SparseGameCore])
+def test_playing_on_a_clone_leaves_the_original_percepts_alone(core_class, tmp_path):
+    original = core_class(np.random.default_rng(3), 1.0, 9, 0.3)
+    original.step(([], [], 0))
+    percept = original.observe()
+    last_percept = original.after_last_move
+    amoeba_map = np.array(percept.amoeba_map)
+    periphery = list(percept.periphery)
+    current_size = percept.current_size
+
+    fork = original.clone()
+    player = DefaultPlayer(rng=fork.rng, logger=logging.getLogger(__name__), metabolism=1.0,
+                           goal_size=fork.goal_size, precomp_dir=str(tmp_path))
+    for _ in range(5):
+        fork_percept = fork.observe()
+        fork_percept.current_size += 1
+        fork_percept.periphery.append((0, 0))
+        fork.step(player.move(fork.after_last_move, fork_percept, fork.player_byte))
+
+    assert original.observe() is percept
+    assert original.after_last_move is last_percept
+    assert percept.current_size == current_size
+    assert percept.periphery == periphery
+    assert np.array_equal(np.asarray(percept.amoeba_map), amoeba_map)
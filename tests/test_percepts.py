@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+from amoeba_state import ask_move
+from amoeba_env import AmoebaEnv
+from game_core import GameCore
+
+
+class WritingPlayer:
+    def move(self, last_percept, current_percept, info):
+        current_percept.amoeba_map[0][0] = 1
+        return [], [], 0
+
+
+def test_writing_into_the_percept_map_explains_writable_amoeba_map():
+    core = GameCore(np.random.default_rng(1), 1.0, 5, 0.1)
+    with pytest.raises(ValueError, match="writable_amoeba_map"):
+        ask_move(WritingPlayer(), core.after_last_move, core.observe(), core.player_byte)
+
+
+def test_players_written_for_the_default_board_refuse_another_size():
+    with pytest.raises(ValueError, match="only plays on the 100x100 board"):
+        AmoebaEnv("3", map_dim=150)
+    assert AmoebaEnv("d", map_dim=150).map_dim == 150
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+import random_streams
+from game_core import GameCore
+from random_streams import RandomStreams, find_two_way_choice_shift
+
+
+def bacteria_trace(mode, bacteria_mode, player_draws):
+    """Plays idle turns and returns the bacteria after each, the player drawing player_draws numbers every turn"""
+    core = GameCore(RandomStreams(11, mode), 1.0, 9, 0.3, bacteria_mode)
+    trace = []
+    for _ in range(10):
+        core.rng.random(player_draws)
+        core.observe()
+        core.step(([], [], 0))
+        trace.append(core.bacteria.positions().copy())
+    return trace
+
+
+def same_traces(a, b):
+    return all(np.array_equal(x, y) for x, y in zip(a, b))
+
+
+@pytest.mark.parametrize("bacteria_mode", ["compat", "fast"])
+def test_player_draws_leave_the_bacteria_alone_in_streams_mode(bacteria_mode):
+    assert same_traces(bacteria_trace("streams", bacteria_mode, 0), bacteria_trace("streams", bacteria_mode, 37))
+    # in legacy mode the player and the bacteria share one generator
+    assert not same_traces(bacteria_trace("legacy", bacteria_mode, 0), bacteria_trace("legacy", bacteria_mode, 37))
+
+
+class FlippedChoiceGenerator:
+    """Generator whose choice between two items picks the other item, as no known NumPy version does"""
+
+    def __init__(self, rng):
+        self.rng = rng
+
+    def choice(self, items, replace=True):
+        return 1 - self.rng.choice(items, replace=replace)
+
+    def integers(self, *args, **kwargs):
+        return self.rng.integers(*args, **kwargs)
+
+
+def test_find_two_way_choice_shift_raises_when_no_bit_matches(monkeypatch):
+    default_rng = np.random.default_rng
+    monkeypatch.setattr(random_streams.np.random, "default_rng",
+                        lambda seed=None: FlippedChoiceGenerator(default_rng(seed)))
+    find_two_way_choice_shift.cache_clear()
+    try:
+        with pytest.raises(RuntimeError, match="Generator.choice"):
+            find_two_way_choice_shift()
+    finally:
+        find_two_way_choice_shift.cache_clear()
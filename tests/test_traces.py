@@ -0,0 +1,20 @@
+import json
+import pytest
+import traces
+
+
+def recorded(player):
+    with open(traces.trace_path(player)) as f:
+        trace = json.load(f)
+    assert trace["game"] == traces.GAME, "the traced game changed, record the traces again"
+    return trace["turns"]
+
+
+@pytest.mark.parametrize("player", traces.PLAYERS)
+def test_dense_compat_games_replay_the_recorded_traces(player):
+    assert traces.play_trace(player) == recorded(player)
+
+
+@pytest.mark.parametrize("player", ["d", "2", "4", "6"])
+def test_sparse_compat_games_replay_the_recorded_traces(player):
+    assert traces.play_trace(player, backend="sparse") == recorded(player)
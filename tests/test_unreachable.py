@@ -0,0 +1,55 @@
+import argparse
+from amoeba_env import AmoebaEnv
+from amoeba_game import AmoebaGame
+
+# few enough bacteria that the goal size gets out of reach some turns before the end
+GAME = {"seed": 2, "metabolism": 1.0, "size": 9, "density": 0.003}
+MAX_TURNS = 30
+
+
+def play_game(play_out):
+    """Plays the game with AmoebaGame as main.py --no_gui --no_vid would"""
+    args = argparse.Namespace(metabolism=GAME["metabolism"], size=GAME["size"], final=MAX_TURNS, play_out=play_out,
+                              density=GAME["density"], seed=GAME["seed"], map_dim=100, backend="dense",
+                              bacteria_mode="compat", rng_mode="legacy", checkpoint_every=0,
+                              checkpoint_dir="checkpoints", checkpoint_keep=2, checkpoint_player=False, resume=None,
+                              no_gui=True, no_vid=True, log_path=None, disable_logging=True, disable_timeout=True,
+                              player="d", vid_name="game")
+    return AmoebaGame(args)
+
+
+def first_unreachable_turn(env):
+    """Plays the game of env to the end and returns the first turn at which growth_bound rules the goal out"""
+    env.reset(**GAME)
+    turn = None
+    while not env.done:
+        if turn is None and not env.core.goal_reachable(MAX_TURNS - env.core.turns):
+            turn = env.core.turns
+        env.step()
+    return turn
+
+
+def test_a_game_ends_at_the_turn_the_goal_gets_out_of_reach():
+    played_out = AmoebaEnv("d", max_turns=MAX_TURNS, play_out=True)
+    expected = first_unreachable_turn(played_out)
+    assert expected is not None and 0 < expected < MAX_TURNS
+    # the bound never ends a game that could still be won
+    assert not played_out.core.goal_reached
+
+    result = AmoebaEnv("d", max_turns=MAX_TURNS).run(**GAME)
+    assert result["unreachable_at"] == expected
+    assert result["turns"] == expected
+    assert not result["goal_reached"]
+
+    game = play_game(play_out=False)
+    assert game.unreachable_turn == game.turns == expected
+
+
+def test_play_out_plays_every_turn():
+    result = AmoebaEnv("d", max_turns=MAX_TURNS, play_out=True).run(**GAME)
+    assert result["unreachable_at"] is None
+    assert result["turns"] == MAX_TURNS
+
+    game = play_game(play_out=True)
+    assert game.unreachable_turn is None
+    assert game.turns == MAX_TURNS
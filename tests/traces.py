@@ -0,0 +1,53 @@
+"""Records and replays per-turn traces of seeded compat games in legacy random stream mode
+
+Every turn of a trace holds the size of the amoeba, a digest of the board and the byte the player passed on. The
+traces in tests/traces were recorded on the engine the series of optimisations started from, so test_traces checks
+that the current engine still plays the same games. Run this file to record them again after a change that is meant
+to alter the games:
+
+    python tests/traces.py
+"""
+import hashlib
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from amoeba_env import AmoebaEnv
+
+TRACE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces")
+PLAYERS = ["d", "1", "2", "3", "4", "5", "6", "7", "8"]
+# seed, metabolism, size, density and number of turns of the game traced for each player
+GAME = {"seed": 2, "metabolism": 0.5, "size": 9, "density": 0.2, "turns": 60}
+
+
+def board_digest(map_state):
+    return hashlib.sha1(map_state.astype("int8").tobytes()).hexdigest()[:16]
+
+
+def trace_path(player):
+    return os.path.join(TRACE_DIR, "{}.json".format(player))
+
+
+def play_trace(player, backend="dense"):
+    """Plays the traced game of player and returns one [amoeba size, board digest, player byte] entry per turn"""
+    env = AmoebaEnv(player, bacteria_mode="compat", max_turns=GAME["turns"], log_path=None, backend=backend,
+                    play_out=True, rng_mode="legacy")
+    try:
+        env.reset(GAME["seed"], GAME["metabolism"], GAME["size"], GAME["density"])
+        turns = []
+        while not env.done:
+            env.step()
+            turns.append([env.core.amoeba_size, board_digest(env.core.map_state), env.core.player_byte])
+    finally:
+        env.close()
+    return turns
+
+
+if __name__ == "__main__":
+    os.makedirs(TRACE_DIR, exist_ok=True)
+    for player in PLAYERS:
+        with open(trace_path(player), "w") as f:
+            json.dump({"game": GAME, "turns": play_trace(player)}, f)
+        print("Recorded", trace_path(player))
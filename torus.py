@@ -0,0 +1,120 @@
+import functools
+import numpy as np
+import constants
+
+# order of the four neighbours in every table below
+UP, DOWN, LEFT, RIGHT = range(4)
+OPPOSITE = (DOWN, UP, RIGHT, LEFT)
+
+# (axis, shift) of np.roll that brings the neighbour in each direction onto the cell itself
+ROLLS = ((1, 1), (1, -1), (0, 1), (0, -1))
+
+
+class Torus:
+    def __init__(self, map_dim):
+        """Precomputed neighbourhoods of a map_dim x map_dim toroidal board
+
+            The board sized tables are built the first time they are used, so code that only calls neighbor_flat
+            never allocates them. get_torus shares one instance between everything that plays on boards of a given
+            size.
+
+            Args:
+                map_dim (int): length of a side of the board
+        """
+        self.map_dim = map_dim
+        self.total_cells = map_dim * map_dim
+        # the coordinate before and after each coordinate, wrapping around
+        self.prev = [(i - 1) % map_dim for i in range(map_dim)]
+        self.next = [(i + 1) % map_dim for i in range(map_dim)]
+
+    @functools.cached_property
+    def flat_index(self):
+        """map_dim x map_dim array holding the flat index x * map_dim + y of every cell (x, y)"""
+        flat_index = np.arange(self.total_cells).reshape(self.map_dim, self.map_dim)
+        flat_index.flags.writeable = False
+        return flat_index
+
+    @functools.cached_property
+    def neighbor_idx(self):
+        """(total_cells, 4) array holding the flat index of the up (y - 1), down (y + 1), left (x - 1) and right
+            (x + 1) neighbour of every cell
+        """
+        neighbor_idx = np.stack([np.roll(self.flat_index, shift, axis=axis) for axis, shift in ROLLS],
+                                axis=-1).reshape(-1, 4)
+        neighbor_idx.flags.writeable = False
+        return neighbor_idx
+
+    def neighbors(self, x, y):
+        """Returns the up, down, left and right neighbours of cell (x, y) as (x, y) tuples"""
+        return (x, self.prev[y]), (x, self.next[y]), (self.prev[x], y), (self.next[x], y)
+
+    def wrap(self, x, y):
+        """Maps any pair of integers onto the cell of the board it lands on"""
+        return x % self.map_dim, y % self.map_dim
+
+    def neighbor_flat(self, flat):
+        """Computes the same rows as neighbor_idx[flat] from the coordinates, without the board sized table
+
+            Args:
+                flat (numpy array): flat board indices of any shape
+            Returns:
+                numpy array: array of the shape of flat with a last axis of the four neighbours
+        """
+        x, y = np.divmod(flat, self.map_dim)
+        row = x * self.map_dim
+        return np.stack([row + (y - 1) % self.map_dim, row + (y + 1) % self.map_dim,
+                         (x - 1) % self.map_dim * self.map_dim + y, (x + 1) % self.map_dim * self.map_dim + y],
+                        axis=-1)
+
+    def shifted(self, board, direction):
+        """Returns an array holding, at every cell, the value of board at the neighbour of that cell in direction
+
+            Args:
+                board (numpy array): map_dim x map_dim array
+                direction (int): one of UP, DOWN, LEFT and RIGHT
+        """
+        axis, shift = ROLLS[direction]
+        return np.roll(board, shift, axis=axis)
+
+    def neighbor_values(self, board):
+        """Returns a (4, map_dim, map_dim) array holding shifted(board, direction) for the four directions in
+            order
+        """
+        return np.stack([self.shifted(board, direction) for direction in range(4)])
+
+    def to_flat(self, cells):
+        """Converts (x, y) cells to flat board indices x * map_dim + y, mapping anything that is not a cell on the
+            board to -1
+        """
+        try:
+            cells = np.asarray(cells) if len(cells) else np.zeros((0, 2), dtype=int)
+        except ValueError:
+            return np.full(len(cells), -1, dtype=int)
+        if cells.ndim != 2 or cells.shape[1] != 2 or cells.dtype.kind not in "biuf":
+            return np.full(len(cells), -1, dtype=int)
+
+        coords = cells.astype(int)
+        valid = ((coords == cells) & (coords >= 0) & (coords < self.map_dim)).all(axis=1)
+        return np.where(valid, coords[:, 0] * self.map_dim + coords[:, 1], -1)
+
+    def to_cells(self, flat):
+        """Converts flat board indices to a list of (x, y) tuples of Python ints"""
+        return list(zip(*(c.tolist() for c in np.divmod(np.asarray(flat, dtype=int), self.map_dim))))
+
+
+@functools.lru_cache(maxsize=None)
+def get_torus(map_dim):
+    return Torus(map_dim)
+
+
+# the board of constants.map_dim cells a side, for code that only plays on the default board; code that follows the
+# size of the game should use get_torus(current_percept.map_dim) instead
+default = get_torus(constants.map_dim)
+flat_index = default.flat_index
+neighbor_idx = default.neighbor_idx
+neighbors = default.neighbors
+wrap = default.wrap
+shifted = default.shifted
+neighbor_values = default.neighbor_values
+to_flat = default.to_flat
+to_cells = default.to_cells
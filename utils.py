@@ -1,6 +1,7 @@
 import logging
 import unicodedata
 import re
+import constants
 
 
 def slugify(value, allow_unicode=False):
@@ -28,6 +29,22 @@ def timeout_handler(signum, frame):   # Custom signal handler
     raise TimeoutException
 
 
+def check_map_dim(player, map_dim):
+    """Raises a ValueError if player, as given to --player, cannot play on a map_dim x map_dim board"""
+    if player in constants.fixed_map_players and map_dim != constants.map_dim:
+        raise ValueError("Player {} only plays on the {}x{} board, not with map_dim {}".format(
+            player, constants.map_dim, constants.map_dim, map_dim))
+
+
+def remove_handlers(logger):
+    """Closes and detaches every handler of logger, such as the file handlers an earlier game in the same process
+    left on the shared module logger
+    """
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        handler.close()
+
+
 class MainLoggingFilter(logging.Filter):
     def __init__(self, name: str) -> None:
         super().__init__(name=name)